@@ -3,8 +3,10 @@ from __future__ import annotations
 
 import base64
 import html
+from functools import lru_cache
 import os
-from typing import Iterable, Optional
+import re
+from typing import Iterable, Optional, Tuple
 
 from fastapi import APIRouter, Form, HTTPException, Request
 from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
@@ -32,8 +34,7 @@ async def canonical_admin(
         results = store.search(dim, q)
     current = store.current_mapping(dim, q) if q else None
     like_bypass = "%" in q if q else False
-    dimensions = sorted(store.dimensions())
-    html_body = _render_page(
+    body = _render_page(
         dim=dim,
         query=q,
         results=results,
@@ -41,9 +42,9 @@ async def canonical_admin(
         like_bypass=like_bypass,
         success=bool(success),
         canonicalizer_version=canonicalizer.version if canonicalizer else None,
-        dimensions=dimensions,
+        options=_render_options(tuple(store.dimensions()), dim),
     )
-    return HTMLResponse(content=html_body)
+    return HTMLResponse(content=body)
 
 
 @router.post("/admin/canonical/promote")
@@ -101,79 +102,50 @@ async def canonical_promote_api(request: Request, payload: _PromotePayload) -> J
     return JSONResponse({"ok": True, "version": version})
 
 
-def _render_page(
-    *,
-    dim: str,
-    query: str,
-    results: Iterable[CanonicalCandidate],
-    current: Optional[str],
-    like_bypass: bool,
-    success: bool,
-    canonicalizer_version: Optional[int],
-    dimensions: Iterable[str],
-) -> str:
-    rows = "\n".join(_render_row(dim, query, candidate) for candidate in results)
-    if not rows:
-        rows = "<tr><td colspan=4 class='empty'>No candidates yet. Try refining your search.</td></tr>"
-    banner = ""
-    if like_bypass:
-        banner = "<div class='banner'>LIKE bypass is active for this search.</div>"
-    toast = ""
-    if success:
-        toast = "<div class='toast'>Synonym promoted successfully.</div>"
-    current_mapping = (
-        f"<p class='current'>Current mapping for <strong>{html.escape(query)}</strong>:"
-        f" <span>{html.escape(current)}</span></p>"
-        if current
-        else ""
-    )
-    version_label = (
-        f"<span class='version'>Cache version: {canonicalizer_version}</span>"
-        if canonicalizer_version is not None
-        else ""
-    )
-    return f"""
+# Page shell (stylesheet and static chrome).  ``%(name)s`` markers delimit the
+# dynamic fragments filled in per request.
+_PAGE_TEMPLATE = """
     <!doctype html>
     <html>
     <head>
         <meta charset="utf-8" />
         <title>Canonicalization Workbench</title>
         <style>
-            body {{ font-family: Arial, sans-serif; margin: 2rem; background: #f5f7fb; }}
-            h1 {{ margin-bottom: 0.5rem; }}
-            form.search {{ margin-bottom: 1.5rem; display: flex; gap: 0.5rem; align-items: center; }}
-            input[type=text] {{ padding: 0.5rem; flex: 1; border: 1px solid #cbd5e1; border-radius: 4px; }}
-            select {{ padding: 0.5rem; border: 1px solid #cbd5e1; border-radius: 4px; }}
-            button {{ background: #2563eb; color: white; border: none; padding: 0.5rem 1rem; border-radius: 4px; cursor: pointer; }}
-            button:hover {{ background: #1d4ed8; }}
-            table {{ width: 100%; border-collapse: collapse; background: white; box-shadow: 0 1px 2px rgba(15,23,42,0.1); }}
-            th, td {{ padding: 0.75rem; text-align: left; border-bottom: 1px solid #e2e8f0; }}
-            th {{ background: #f1f5f9; text-transform: uppercase; font-size: 0.75rem; letter-spacing: 0.05em; color: #475569; }}
-            td.actions form {{ display: inline; }}
-            td.actions button {{ background: #16a34a; }}
-            td.actions button:hover {{ background: #15803d; }}
-            .banner {{ background: #f59e0b; color: #111827; padding: 0.5rem 0.75rem; border-radius: 4px; margin-bottom: 1rem; }}
-            .toast {{ background: #22c55e; color: white; padding: 0.5rem 0.75rem; border-radius: 4px; margin-bottom: 1rem; }}
-            .current {{ margin-bottom: 1rem; color: #334155; }}
-            .current span {{ font-weight: bold; }}
-            .empty {{ text-align: center; color: #64748b; font-style: italic; }}
-            footer {{ margin-top: 1.5rem; color: #64748b; font-size: 0.85rem; display: flex; justify-content: space-between; align-items: center; }}
-            .version {{ background: #e0f2fe; color: #0369a1; padding: 0.25rem 0.5rem; border-radius: 999px; }}
+            body { font-family: Arial, sans-serif; margin: 2rem; background: #f5f7fb; }
+            h1 { margin-bottom: 0.5rem; }
+            form.search { margin-bottom: 1.5rem; display: flex; gap: 0.5rem; align-items: center; }
+            input[type=text] { padding: 0.5rem; flex: 1; border: 1px solid #cbd5e1; border-radius: 4px; }
+            select { padding: 0.5rem; border: 1px solid #cbd5e1; border-radius: 4px; }
+            button { background: #2563eb; color: white; border: none; padding: 0.5rem 1rem; border-radius: 4px; cursor: pointer; }
+            button:hover { background: #1d4ed8; }
+            table { width: 100%; border-collapse: collapse; background: white; box-shadow: 0 1px 2px rgba(15,23,42,0.1); }
+            th, td { padding: 0.75rem; text-align: left; border-bottom: 1px solid #e2e8f0; }
+            th { background: #f1f5f9; text-transform: uppercase; font-size: 0.75rem; letter-spacing: 0.05em; color: #475569; }
+            td.actions form { display: inline; }
+            td.actions button { background: #16a34a; }
+            td.actions button:hover { background: #15803d; }
+            .banner { background: #f59e0b; color: #111827; padding: 0.5rem 0.75rem; border-radius: 4px; margin-bottom: 1rem; }
+            .toast { background: #22c55e; color: white; padding: 0.5rem 0.75rem; border-radius: 4px; margin-bottom: 1rem; }
+            .current { margin-bottom: 1rem; color: #334155; }
+            .current span { font-weight: bold; }
+            .empty { text-align: center; color: #64748b; font-style: italic; }
+            footer { margin-top: 1.5rem; color: #64748b; font-size: 0.85rem; display: flex; justify-content: space-between; align-items: center; }
+            .version { background: #e0f2fe; color: #0369a1; padding: 0.25rem 0.5rem; border-radius: 999px; }
         </style>
     </head>
     <body>
         <h1>Canonicalization Workbench</h1>
-        {banner}
-        {toast}
+        %(banner)s
+        %(toast)s
         <form class="search" method="get" action="/admin/canonical">
             <label for="dim">Dimension</label>
             <select name="dim" id="dim">
-                {''.join(_render_option(dim, option) for option in dimensions)}
+                %(options)s
             </select>
-            <input type="text" name="q" value="{html.escape(query)}" placeholder="Search for a synonym" />
+            <input type="text" name="q" value="%(query)s" placeholder="Search for a synonym" />
             <button type="submit">Search</button>
         </form>
-        {current_mapping}
+        %(current_mapping)s
         <table>
             <thead>
                 <tr>
@@ -184,38 +156,107 @@ def _render_page(
                 </tr>
             </thead>
             <tbody>
-                {rows}
+                %(rows)s
             </tbody>
         </table>
         <footer>
             <span>LIKE searches are bypassed when patterns are used.</span>
-            {version_label}
+            %(version_label)s
         </footer>
     </body>
     </html>
     """
 
+_PLACEHOLDER_RE = re.compile(r"%\((\w+)\)s")
+_PAGE_PARTS = _PLACEHOLDER_RE.split(_PAGE_TEMPLATE)
+# Static segments are encoded once at import; fields alternate with them.
+_PAGE_STATIC = tuple(part.encode("utf-8") for part in _PAGE_PARTS[0::2])
+_PAGE_FIELDS = tuple(_PAGE_PARTS[1::2])
 
-def _render_row(dim: str, query: str, candidate: CanonicalCandidate) -> str:
-    score = f"{candidate.score:.2f}"
-    canonical = candidate.canonical or "—"
-    return (
-        "<tr>"
-        f"<td>{html.escape(candidate.candidate)}</td>"
-        f"<td>{score}</td>"
-        f"<td>{html.escape(canonical)}</td>"
-        "<td class='actions'>"
-        "<form method='post' action='/admin/canonical/promote'>"
-        f"<input type='hidden' name='dim' value='{html.escape(dim)}' />"
-        f"<input type='hidden' name='synonym' value='{html.escape(query)}' />"
-        f"<input type='hidden' name='canonical' value='{html.escape(candidate.candidate)}' />"
-        f"<input type='hidden' name='score' value='{candidate.score}' />"
-        f"<input type='hidden' name='q' value='{html.escape(query)}' />"
-        "<button type='submit'>Promote</button>"
-        "</form>"
-        "</td>"
-        "</tr>"
+
+def _render_page(
+    *,
+    dim: str,
+    query: str,
+    results: Iterable[CanonicalCandidate],
+    current: Optional[str],
+    like_bypass: bool,
+    success: bool,
+    canonicalizer_version: Optional[int],
+    options: str,
+) -> bytes:
+    rows = _render_rows(dim, query, results)
+    if not rows:
+        rows = "<tr><td colspan=4 class='empty'>No candidates yet. Try refining your search.</td></tr>"
+    banner = ""
+    if like_bypass:
+        banner = "<div class='banner'>LIKE bypass is active for this search.</div>"
+    toast = ""
+    if success:
+        toast = "<div class='toast'>Synonym promoted successfully.</div>"
+    current_mapping = (
+        f"<p class='current'>Current mapping for <strong>{html.escape(query)}</strong>:"
+        f" <span>{html.escape(current)}</span></p>"
+        if current
+        else ""
     )
+    version_label = (
+        f"<span class='version'>Cache version: {canonicalizer_version}</span>"
+        if canonicalizer_version is not None
+        else ""
+    )
+    fields = {
+        "banner": banner,
+        "toast": toast,
+        "options": options,
+        "query": html.escape(query),
+        "current_mapping": current_mapping,
+        "rows": rows,
+        "version_label": version_label,
+    }
+    chunks = [_PAGE_STATIC[0]]
+    for name, static in zip(_PAGE_FIELDS, _PAGE_STATIC[1:]):
+        chunks.append(fields[name].encode("utf-8"))
+        chunks.append(static)
+    return b"".join(chunks)
+
+
+_ROW_TEMPLATE = (
+    "<tr>"
+    "<td>%(candidate)s</td>"
+    "<td>%(score).2f</td>"
+    "<td>%(canonical)s</td>"
+    "<td class='actions'>"
+    "<form method='post' action='/admin/canonical/promote'>"
+    "<input type='hidden' name='dim' value='%(dim)s' />"
+    "<input type='hidden' name='synonym' value='%(query)s' />"
+    "<input type='hidden' name='canonical' value='%(candidate)s' />"
+    "<input type='hidden' name='score' value='%(raw_score)s' />"
+    "<input type='hidden' name='q' value='%(query)s' />"
+    "<button type='submit'>Promote</button>"
+    "</form>"
+    "</td>"
+    "</tr>"
+)
+
+
+def _render_rows(dim: str, query: str, results: Iterable[CanonicalCandidate]) -> str:
+    # ``dim`` and ``query`` are shared by every row, so escape them once.
+    fields = {"dim": html.escape(dim), "query": html.escape(query)}
+    rows = []
+    for candidate in results:
+        fields["candidate"] = html.escape(candidate.candidate)
+        fields["score"] = fields["raw_score"] = candidate.score
+        fields["canonical"] = html.escape(candidate.canonical or "—")
+        rows.append(_ROW_TEMPLATE % fields)
+    return "".join(rows)
+
+
+@lru_cache(maxsize=64)
+def _render_options(dimensions: Tuple[str, ...], current: str) -> str:
+    # The dimension list comes from the semantic model and never changes for a
+    # running store, so the escaped <option> list is built once per selection.
+    return "".join(_render_option(current, option) for option in sorted(dimensions))
 
 
 def _render_option(current: str, option: str) -> str:
@@ -3,13 +3,16 @@ from __future__ import annotations
 
 import json
 import os
+from collections import OrderedDict
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Tuple
 
 try:  # pragma: no cover - standard runtime import
     from fastapi import APIRouter, HTTPException
-    from fastapi.responses import JSONResponse
+    from fastapi.responses import Response
 except Exception:  # pragma: no cover - tests stub out fastapi
     class HTTPException(Exception):  # type: ignore[misc, override]
         def __init__(self, status_code: int, detail: Any):
@@ -27,12 +30,13 @@ except Exception:  # pragma: no cover - tests stub out fastapi
 
             return decorator
 
-    class JSONResponse(dict):  # type: ignore[override]
-        def __init__(self, *, content: Dict[str, Any], status_code: int = 200) -> None:
-            super().__init__(content)
+    class Response:  # type: ignore[override]
+        def __init__(self, content: Any = None, status_code: int = 200, media_type: Optional[str] = None) -> None:
+            self.body = content
             self.status_code = status_code
+            self.media_type = media_type
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from . import tools
 
@@ -41,6 +45,11 @@ try:  # pragma: no cover - exercised at runtime
 except Exception:  # pragma: no cover - defensive: SDK might be missing
     OpenAI = None  # type: ignore
 
+try:  # pragma: no cover - optional C accelerator for JSON
+    import orjson
+except Exception:  # pragma: no cover - fall back to the stdlib encoder
+    orjson = None  # type: ignore
+
 
 router = APIRouter(prefix="/agent", tags=["agent"])
 
@@ -107,6 +116,8 @@ _TOOL_DEFINITIONS = [
 class AgentRequest(BaseModel):
     """Inbound payload received from ChatKit."""
 
+    model_config = ConfigDict(extra="ignore")
+
     message: str = Field(..., description="Latest user utterance.")
     thread_id: Optional[str] = Field(None, description="Existing OpenAI thread identifier.")
     session_id: Optional[str] = Field(
@@ -120,6 +131,8 @@ class AgentRequest(BaseModel):
 class AgentResponse(BaseModel):
     """Response returned to ChatKit."""
 
+    model_config = ConfigDict(extra="ignore")
+
     thread_id: str
     table: List[Dict[str, Any]]
     chart: Dict[str, Any]
@@ -129,35 +142,63 @@ class AgentResponse(BaseModel):
 
 
 class _ThreadStore:
-    """Simple in-memory persistence of thread ids keyed by session id."""
+    """Bounded in-memory persistence of thread ids keyed by session id.
+
+    Sessions are spread over independently locked LRU shards so concurrent
+    requests rarely contend; each shard evicts its least recently recorded
+    session once it holds ``capacity / shards`` entries.  Reads do not lock:
+    a single ``OrderedDict.get`` is atomic under the GIL.
+    """
 
-    def __init__(self) -> None:
-        self._lock = threading.Lock()
-        self._threads: Dict[str, str] = {}
+    def __init__(self, capacity: int = 10_000, shards: int = 16) -> None:
+        self._shards: List["OrderedDict[str, str]"] = [OrderedDict() for _ in range(shards)]
+        self._locks = [threading.Lock() for _ in range(shards)]
+        self._max_per_shard = max(1, capacity // shards)
 
     def get(self, session_id: Optional[str]) -> Optional[str]:
         if not session_id:
             return None
-        with self._lock:
-            return self._threads.get(session_id)
+        return self._shards[hash(session_id) % len(self._shards)].get(session_id)
 
     def set(self, session_id: Optional[str], thread_id: str) -> None:
         if not session_id:
             return
-        with self._lock:
-            self._threads[session_id] = thread_id
+        index = hash(session_id) % len(self._shards)
+        shard = self._shards[index]
+        with self._locks[index]:
+            shard[session_id] = thread_id
+            shard.move_to_end(session_id)
+            if len(shard) > self._max_per_shard:
+                shard.popitem(last=False)
 
 
 _thread_store = _ThreadStore()
 _assistant_cache: Dict[str, str] = {}
 _assistant_lock = threading.Lock()
+_POLL_BASE_DELAY = 0.05
+_POLL_MAX_DELAY = 0.5
+_MAX_TOOL_WORKERS = 8
 
 
 def _json_dumps(value: Any) -> str:
+    if orjson is not None:
+        options = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+        return orjson.dumps(value, default=str, option=options).decode("utf-8")
     return json.dumps(value, default=str, sort_keys=True)
 
 
-def _ensure_client() -> Any:
+def _json_loads(value: str) -> Any:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can
+    # keep catching the stdlib exception.
+    if orjson is not None:
+        return orjson.loads(value)
+    return json.loads(value)
+
+
+@lru_cache(maxsize=1)
+def _openai_client() -> Any:
+    """Build the process-wide OpenAI client; failures are not cached."""
+
     if OpenAI is None:
         raise HTTPException(status_code=503, detail="openai SDK is not installed")
     try:
@@ -166,7 +207,14 @@ def _ensure_client() -> Any:
         raise HTTPException(status_code=503, detail=f"Failed to initialise OpenAI client: {exc}") from exc
 
 
+def _ensure_client() -> Any:
+    return _openai_client()
+
+
 def _ensure_agent(client: Any, model: str) -> str:
+    cached = _assistant_cache.get(model)
+    if cached:
+        return cached
     with _assistant_lock:
         cached = _assistant_cache.get(model)
         if cached:
@@ -196,13 +244,40 @@ def _resolve_thread(client: Any, payload: AgentRequest) -> str:
 def _dispatch_tool_call(name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
     if name == "compile_plan_and_query":
         result = tools.compile_plan_and_query(**arguments)
-        return result.dict()
+        return result.model_dump(mode="json")
     if name == "summarize_and_validate":
         result = tools.summarize_and_validate(**arguments)
-        return result.dict()
+        return result.model_dump(mode="json")
     raise HTTPException(status_code=500, detail=f"Unsupported tool invocation: {name}")
 
 
+def _dispatch_tool_calls(tool_calls: List[Any]) -> List[Dict[str, str]]:
+    """Run the requested tools, concurrently when the agent asks for several."""
+
+    # Parse every argument payload up front so malformed JSON fails the request
+    # before any tool runs.
+    invocations = []
+    for call in tool_calls:
+        name = getattr(call.function, "name", "")
+        arguments_json = getattr(call.function, "arguments", "{}")
+        try:
+            arguments = _json_loads(arguments_json)
+        except json.JSONDecodeError as exc:
+            raise HTTPException(status_code=400, detail=f"Invalid tool arguments: {exc}") from exc
+        invocations.append((name, arguments))
+    if len(invocations) <= 1:
+        results = [_dispatch_tool_call(name, arguments) for name, arguments in invocations]
+    else:
+        workers = min(_MAX_TOOL_WORKERS, len(invocations))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_dispatch_tool_call, name, arguments) for name, arguments in invocations]
+            results = [future.result() for future in futures]
+    return [
+        {"tool_call_id": call.id, "output": _json_dumps(result)}
+        for call, result in zip(tool_calls, results)
+    ]
+
+
 def _collect_assistant_reply(client: Any, thread_id: str) -> Dict[str, Any]:
     messages = client.beta.threads.messages.list(thread_id=thread_id, order="desc", limit=1)
     if not messages.data:
@@ -216,7 +291,7 @@ def _collect_assistant_reply(client: Any, thread_id: str) -> Dict[str, Any]:
     if not raw_text:
         raise HTTPException(status_code=500, detail="Agent response was empty")
     try:
-        parsed = json.loads(raw_text)
+        parsed = _json_loads(raw_text)
     except json.JSONDecodeError as exc:
         raise HTTPException(status_code=500, detail=f"Agent response was not valid JSON: {exc}") from exc
     for key in ("table", "chart", "sql", "summary", "warnings"):
@@ -225,6 +300,12 @@ def _collect_assistant_reply(client: Any, thread_id: str) -> Dict[str, Any]:
     return parsed
 
 
+def _poll_delay(attempt: int) -> float:
+    """Exponential backoff for run polling: 50ms doubling up to 500ms."""
+
+    return min(_POLL_MAX_DELAY, _POLL_BASE_DELAY * (2 ** min(attempt, 10)))
+
+
 def _run_agent(client: Any, assistant_id: str, thread_id: str, payload: AgentRequest) -> Dict[str, Any]:
     client.beta.threads.messages.create(
         thread_id=thread_id,
@@ -235,42 +316,37 @@ def _run_agent(client: Any, assistant_id: str, thread_id: str, payload: AgentReq
         thread_id=thread_id,
         assistant_id=assistant_id,
     )
+    attempt = 0
     while True:
         run = client.beta.threads.runs.retrieve(thread_id=thread_id, run_id=run.id)
         status = getattr(run, "status", None)
         if status in {"queued", "in_progress"}:
-            time.sleep(0.3)
+            time.sleep(_poll_delay(attempt))
+            attempt += 1
             continue
         if status == "requires_action":
             required = getattr(run, "required_action", None)
             if not required:
                 raise HTTPException(status_code=500, detail="Agent run requires action without tool calls")
             tool_calls = getattr(required.submit_tool_outputs, "tool_calls", [])
-            outputs = []
-            for call in tool_calls:
-                name = getattr(call.function, "name", "")
-                arguments_json = getattr(call.function, "arguments", "{}")
-                try:
-                    arguments = json.loads(arguments_json)
-                except json.JSONDecodeError as exc:
-                    raise HTTPException(status_code=400, detail=f"Invalid tool arguments: {exc}") from exc
-                result = _dispatch_tool_call(name, arguments)
-                outputs.append({"tool_call_id": call.id, "output": _json_dumps(result)})
+            outputs = _dispatch_tool_calls(tool_calls)
             run = client.beta.threads.runs.submit_tool_outputs(
                 thread_id=thread_id,
                 run_id=run.id,
                 tool_outputs=outputs,
             )
+            attempt = 0
             continue
         if status == "completed":
             return _collect_assistant_reply(client, thread_id)
         if status in {"failed", "cancelled", "expired"}:
             raise HTTPException(status_code=500, detail=f"Agent run terminated with status={status}")
-        time.sleep(0.3)
+        time.sleep(_poll_delay(attempt))
+        attempt += 1
 
 
 @router.post("", response_model=AgentResponse)
-def agent_entrypoint(payload: AgentRequest) -> JSONResponse:
+def agent_entrypoint(payload: AgentRequest) -> Response:
     """Primary endpoint consumed by ChatKit."""
 
     client = _ensure_client()
@@ -280,11 +356,12 @@ def agent_entrypoint(payload: AgentRequest) -> JSONResponse:
     _thread_store.set(payload.session_id, thread_id)
 
     response_payload = _run_agent(client, assistant_id, thread_id, payload)
-    response_payload_sorted = json.loads(_json_dumps(response_payload))
-    response_payload_sorted["thread_id"] = thread_id
+    response_payload["thread_id"] = thread_id
 
-    validated = AgentResponse(thread_id=thread_id, **response_payload_sorted)
-    return JSONResponse(content=json.loads(_json_dumps(validated.dict())))
+    validated = AgentResponse(**response_payload)
+    # Serialise straight from the validated model: one encode pass, no
+    # intermediate dict for Starlette's JSON encoder to walk again.
+    return Response(content=validated.model_dump_json(), media_type="application/json")
 
 
 def ensure_agent_runtime(model: Optional[str] = None) -> Tuple[Any, str, str]:
@@ -8,18 +8,39 @@ keeps the behaviour of the legacy ``/ask`` and ``/chat`` routes intact.
 from __future__ import annotations
 
 import os
-from typing import Any, Dict, Iterable, List, Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from ..planner import build_plan, get_last_intent_engine
 from ..summarizer import HallucinationError, SummarizerError, summarize_results
 from ..viz import build_narrative, choose_chart
 
 
+def _read_use_summarizer() -> bool:
+    return os.getenv("USE_SUMMARIZER", "false").strip().lower() in {"1", "true", "yes"}
+
+
+# Resolved once at import; call ``reload_env`` after changing the environment.
+_USE_SUMMARIZER = _read_use_summarizer()
+_runtime_ready = False
+
+
+def reload_env() -> None:
+    """Re-read environment-driven settings (useful for tests)."""
+
+    global _USE_SUMMARIZER
+    _USE_SUMMARIZER = _read_use_summarizer()
+
+
 class QueryCompilationResult(BaseModel):
     """Structured representation returned by ``compile_plan_and_query``."""
 
+    model_config = ConfigDict(frozen=True)
+
     question: str = Field(..., description="Natural language question supplied by the user.")
     plan: Dict[str, Any] = Field(..., description="Resolved analytics plan ready for SQL compilation.")
     sql: str = Field(..., description="Deterministic SELECT query executed against DuckDB.")
@@ -32,11 +53,53 @@ class QueryCompilationResult(BaseModel):
 class SummaryResult(BaseModel):
     """Response envelope for ``summarize_and_validate`` outputs."""
 
+    model_config = ConfigDict(frozen=True)
+
     summary: str = Field(..., description="Narrative explanation of the result set.")
     chart: Dict[str, Any] = Field(..., description="Renderable chart specification.")
     warnings: List[str] = Field(default_factory=list, description="Additional warning messages emitted by guardrails.")
 
 
+class _CompilationCache:
+    """Thread-safe LRU of compiled results with a time-to-live.
+
+    Entries expire after ``ttl`` seconds so relative time windows ("last
+    month") and refreshed data are never served stale for long.
+    """
+
+    def __init__(self, maxsize: int = 512, ttl: float = 300.0) -> None:
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, QueryCompilationResult]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[QueryCompilationResult]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, result = entry
+            if time.monotonic() - stored_at > self._ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return result
+
+    def put(self, key: Hashable, result: QueryCompilationResult) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_compilation_cache = _CompilationCache()
+
+
 def _get_main_module():
     """Import ``app.main`` lazily to avoid circular import issues."""
 
@@ -48,6 +111,9 @@ def _get_main_module():
 def _ensure_runtime_dependencies(main_app: Any) -> None:
     """Validate that the FastAPI application has initialised its shared state."""
 
+    global _runtime_ready
+    if _runtime_ready:
+        return
     missing: List[str] = []
     for key in ("executor", "resolver", "semantic"):
         if key not in main_app._state:  # type: ignore[attr-defined]
@@ -56,6 +122,7 @@ def _ensure_runtime_dependencies(main_app: Any) -> None:
         raise RuntimeError(
             "Application state has not been initialised; missing: " + ", ".join(sorted(missing))
         )
+    _runtime_ready = True
 
 
 def _execute_with_legacy_pipeline(plan: Dict[str, Any], question: str, *, intent_engine: str) -> Dict[str, Any]:
@@ -83,6 +150,13 @@ def compile_plan_and_query(
     if not cleaned_question:
         raise ValueError("Question must be a non-empty string.")
 
+    cache_key = (" ".join(cleaned_question.split()), prefer_llm, _canonical_version())
+    cached = _compilation_cache.get(cache_key)
+    if cached is not None:
+        if cached.question != cleaned_question:
+            return cached.model_copy(update={"question": cleaned_question})
+        return cached
+
     plan = build_plan(cleaned_question, prefer_llm=prefer_llm)
     intent_engine = get_last_intent_engine()
     execution = _execute_with_legacy_pipeline(plan, cleaned_question, intent_engine=intent_engine)
@@ -96,9 +170,17 @@ def compile_plan_and_query(
         summary=execution.get("answer", ""),
         warnings=list(execution.get("warnings", []) or []),
     )
+    _compilation_cache.put(cache_key, result)
     return result
 
 
+def _canonical_version() -> Optional[int]:
+    """Return the loaded canonical mapping version, used to key cached plans."""
+
+    canonicalizer = _get_main_module()._state.get("canonicalizer")  # type: ignore[attr-defined]
+    return canonicalizer.version if canonicalizer is not None else None
+
+
 def summarize_and_validate(
     *,
     plan: Dict[str, Any],
@@ -108,22 +190,21 @@ def summarize_and_validate(
     """Produce a narrative summary while surfacing validation warnings.
 
     ``records`` may be any iterable of dictionaries; it is eagerly materialised
-    to ensure deterministic iteration order for JSON serialisation.
+    to ensure deterministic iteration order for JSON serialisation.  A list of
+    plain dicts (the usual shape from the executor) is used as-is since the
+    downstream helpers only read it.
     """
 
-    materialised_records = [dict(row) for row in records]
+    if isinstance(records, list) and all(type(row) is dict for row in records):
+        materialised_records = records
+    else:
+        materialised_records = [dict(row) for row in records]
 
     chart = choose_chart(plan, materialised_records)
     narrative = build_narrative(plan, materialised_records)
     warnings: List[str] = []
 
-    use_summarizer = os.getenv("USE_SUMMARIZER", "false").strip().lower() in {
-        "1",
-        "true",
-        "yes",
-    }
-
-    if use_summarizer:
+    if _USE_SUMMARIZER:
         try:
             summary_blob = summarize_results(materialised_records, plan)
         except (SummarizerError, HallucinationError):
@@ -2,12 +2,15 @@
 from __future__ import annotations
 
 from collections import Counter
+import heapq
 import re
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import lru_cache
 from math import sqrt
-from typing import Iterable, List, Sequence, Tuple
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
 
 
+@lru_cache(maxsize=4096)
 def _normalise(text: str) -> str:
     return text.strip().lower()
 
@@ -19,61 +22,201 @@ def _trigrams(text: str) -> Counter[str]:
     return Counter(padded[i : i + 3] for i in range(len(padded) - 2))
 
 
-def cosine_similarity(a: str, b: str) -> float:
-    """Return cosine similarity between two strings using trigram vectors."""
+def _trigram_vector(text: str) -> Tuple[Counter[str], float]:
+    """Return the trigram counts of *text* together with their L2 norm."""
 
-    vec_a = _trigrams(a)
-    vec_b = _trigrams(b)
-    if not vec_a or not vec_b:
-        return 0.0
-    dot = 0.0
-    for token, weight in vec_a.items():
-        dot += float(weight * vec_b.get(token, 0))
-    norm_a = sqrt(sum(float(weight * weight) for weight in vec_a.values()))
-    norm_b = sqrt(sum(float(weight * weight) for weight in vec_b.values()))
+    vec = _trigrams(text)
+    return vec, sqrt(sum(weight * weight for weight in vec.values()))
+
+
+def _cosine(vec_a: Counter[str], norm_a: float, vec_b: Counter[str], norm_b: float) -> float:
     if norm_a == 0.0 or norm_b == 0.0:
         return 0.0
+    # Walk the sparser vector; both are small dicts so lookups dominate.
+    if len(vec_a) > len(vec_b):
+        vec_a, vec_b = vec_b, vec_a
+    lookup = vec_b.get
+    dot = sum(weight * lookup(token, 0) for token, weight in vec_a.items())
     return dot / (norm_a * norm_b)
 
 
+def cosine_similarity(a: str, b: str) -> float:
+    """Return cosine similarity between two strings using trigram vectors."""
+
+    return _cosine(*_trigram_vector(a), *_trigram_vector(b))
+
+
 @dataclass
 class FuzzyMatch:
     candidate: str
     score: float
 
 
+@dataclass
+class FuzzyIndex:
+    """Inverted index over a fitted candidate list.
+
+    ``postings`` maps each trigram to ``(position, count)`` pairs for the
+    candidates that contain it, which is enough to accumulate every cosine
+    dot product without touching non-matching candidates.  ``initials`` maps
+    the lower-cased first letter of each candidate's acronym to candidate
+    positions.  Together they cover every way ``FuzzyMatcher.rank`` can award
+    a positive score.
+    """
+
+    candidates: List[str]
+    magnitudes: List[float]
+    norms: List[str]
+    acronyms: List[str]
+    postings: Dict[str, List[Tuple[int, int]]]
+    initials: Dict[str, List[int]]
+
+    def dot_products(self, query_vec: Counter[str]) -> Dict[int, int]:
+        dots: Dict[int, int] = {}
+        get = dots.get
+        for token, weight in query_vec.items():
+            for position, count in self.postings.get(token, ()):
+                dots[position] = get(position, 0) + weight * count
+        return dots
+
+    def hits(self, dots: Dict[int, int], query_norm: str) -> List[int]:
+        positions = set(dots)
+        positions.update(self.initials.get(query_norm[0], ()))
+        return sorted(positions)
+
+
 @dataclass
 class FuzzyMatcher:
     """Search helper that ranks candidates using trigram cosine similarity."""
 
     threshold: float = 0.75
     limit: int = 10
+    _vectors: Dict[str, Tuple[Counter[str], float]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _cache_token: Optional[Hashable] = field(default=None, init=False, repr=False, compare=False)
+    _index: Optional[FuzzyIndex] = field(default=None, init=False, repr=False, compare=False)
+
+    def fit(self, candidates: Iterable[str]) -> None:
+        """Index *candidates* so subsequent ``rank`` calls only score likely hits."""
+
+        self._index = self.build_index(candidates)
+
+    def build_index(self, candidates: Iterable[str]) -> FuzzyIndex:
+        """Return a reusable index over *candidates* for ``rank_indexed``."""
+
+        values = list(candidates)
+        magnitudes = []
+        norms = []
+        acronyms = []
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        initials: Dict[str, List[int]] = {}
+        for position, candidate in enumerate(values):
+            vector, magnitude = self._candidate_vector(candidate)
+            magnitudes.append(magnitude)
+            for token, count in vector.items():
+                postings.setdefault(token, []).append((position, count))
+            norms.append(_normalise(candidate))
+            acronym = _acronym(candidate).lower()
+            acronyms.append(acronym)
+            if acronym:
+                initials.setdefault(acronym[0], []).append(position)
+        return FuzzyIndex(values, magnitudes, norms, acronyms, postings, initials)
+
+    def rank(
+        self,
+        query: str,
+        candidates: Sequence[str],
+        *,
+        cache_token: Optional[Hashable] = None,
+    ) -> List[FuzzyMatch]:
+        """Score *candidates* against *query*, best first.
+
+        Candidate trigram vectors are memoised across calls.  Passing a
+        ``cache_token`` (e.g. the canonical store version) drops the memo
+        whenever the token changes.  The candidate list is indexed on first
+        use and re-indexed only when a different list is passed in.
+        """
+
+        if cache_token is not None and cache_token != self._cache_token:
+            self.invalidate()
+            self._cache_token = cache_token
+        index = self._index
+        if index is None or (
+            candidates is not index.candidates and list(candidates) != index.candidates
+        ):
+            index = self._index = self.build_index(candidates)
+        return self.rank_indexed(query, index)
+
+    def rank_indexed(self, query: str, index: FuzzyIndex) -> List[FuzzyMatch]:
+        """Score the candidates of a prebuilt *index* against *query*."""
 
-    def rank(self, query: str, candidates: Sequence[str]) -> List[FuzzyMatch]:
-        scored: List[Tuple[float, str]] = []
         query_norm = _normalise(query)
-        for candidate in candidates:
-            score = cosine_similarity(query, candidate)
-            candidate_norm = _normalise(candidate)
+        query_vec, query_mag = _trigram_vector(query)
+        dots = index.dot_products(query_vec)
+        if query_norm and self.threshold > 0:
+            positions: Iterable[int] = index.hits(dots, query_norm)
+        else:
+            # An empty query prefixes everything and a non-positive threshold
+            # admits zero scores, so neither can be pruned.
+            positions = range(len(index.candidates))
+        query_len = len(query_norm)
+        scored: List[Tuple[float, str]] = []
+        for position in positions:
+            magnitude = index.magnitudes[position]
+            if query_mag == 0.0 or magnitude == 0.0:
+                score = 0.0
+            else:
+                score = dots.get(position, 0) / (query_mag * magnitude)
+            candidate_norm = index.norms[position]
             if candidate_norm.startswith(query_norm):
                 score = max(score, 0.9)
-            elif query_norm and len(query_norm) >= 3 and query_norm in candidate_norm:
-                fraction = min(len(query_norm) / max(len(candidate_norm), 1), 1.0)
+            elif query_len >= 3 and query_norm in candidate_norm:
+                fraction = min(query_len / max(len(candidate_norm), 1), 1.0)
                 score = max(score, 0.75 + 0.2 * fraction)
-            acronym = _acronym(candidate)
-            if acronym and _normalise(acronym).startswith(query_norm):
-                fraction = min(len(query_norm) / len(acronym), 1.0)
+            acronym = index.acronyms[position]
+            if acronym and acronym.startswith(query_norm):
+                fraction = min(query_len / len(acronym), 1.0)
                 score = max(score, 0.85 + 0.15 * fraction)
             if score < self.threshold:
                 continue
-            scored.append((score, candidate))
-        scored.sort(key=lambda item: (-item[0], item[1]))
-        return [FuzzyMatch(candidate=cand, score=score) for score, cand in scored[: self.limit]]
+            scored.append((score, index.candidates[position]))
+        # Only the top ``limit`` entries are returned, so select them with a
+        # bounded heap rather than sorting every hit.
+        best = heapq.nsmallest(self.limit, scored, key=_rank_key)
+        return [FuzzyMatch(candidate=cand, score=score) for score, cand in best]
+
+    def search(
+        self,
+        query: str,
+        candidates: Iterable[str],
+        *,
+        cache_token: Optional[Hashable] = None,
+    ) -> List[FuzzyMatch]:
+        return self.rank(query, list(candidates), cache_token=cache_token)
+
+    def invalidate(self) -> None:
+        """Forget memoised vectors and the candidate index (call after the candidate set changes)."""
+
+        self._vectors.clear()
+        self._cache_token = None
+        self._index = None
+
+    def _candidate_vector(self, candidate: str) -> Tuple[Counter[str], float]:
+        vector = self._vectors.get(candidate)
+        if vector is None:
+            vector = _trigram_vector(candidate)
+            self._vectors[candidate] = vector
+        return vector
+
+
+def _rank_key(item: Tuple[float, str]) -> Tuple[float, str]:
+    return -item[0], item[1]
+
 
-    def search(self, query: str, candidates: Iterable[str]) -> List[FuzzyMatch]:
-        return self.rank(query, list(candidates))
+_WORD_RE = re.compile(r"[A-Za-z0-9]+")
 
 
+@lru_cache(maxsize=4096)
 def _acronym(text: str) -> str:
-    parts = re.findall(r"[A-Za-z0-9]+", text)
-    return "".join(part[0] for part in parts if part)
+    return "".join(part[0] for part in _WORD_RE.findall(text))
@@ -1,16 +1,17 @@
 """Persistent storage helpers for canonical mappings."""
 from __future__ import annotations
 
+import threading
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
 import duckdb
 
 from ..executor import DuckDBExecutor
 from ..resolver import SemanticDimension, SemanticModel
-from .fuzzy import FuzzyMatcher, FuzzyMatch
+from .fuzzy import FuzzyIndex, FuzzyMatcher, FuzzyMatch
 
 
 @dataclass
@@ -22,6 +23,21 @@ class CanonicalCandidate:
     canonical: Optional[str]
 
 
+@dataclass
+class _CandidateSet:
+    """Search candidates for one dimension at one store version.
+
+    ``canonicals`` maps each candidate to its promoted canonical value, when
+    there is one, so results need no per-match normalisation or lookup.
+    ``index`` is the matcher's precomputed trigram index over ``originals``.
+    """
+
+    version: int
+    originals: List[str]
+    canonicals: Dict[str, str]
+    index: FuzzyIndex
+
+
 class CanonicalStore:
     """Manage canonical mappings stored in DuckDB."""
 
@@ -33,10 +49,20 @@ class CanonicalStore:
         matcher: Optional[FuzzyMatcher] = None,
         max_candidates: int = 500,
     ) -> None:
-        self._db_path = Path(executor.db_path)
+        self._executor = executor
         self._semantic = semantic
         self._matcher = matcher or FuzzyMatcher()
         self._max_candidates = max_candidates
+        self._write_lock = threading.Lock()
+        self._version_changed = threading.Condition()
+        self._promoted_version = 0
+        self._dim_sql = {
+            name: self._dimension_sql(dimension) for name, dimension in semantic.dimensions.items()
+        }
+        # dim -> (version, synonym_key -> canonical)
+        self._mapping_cache: Dict[str, Tuple[int, Dict[str, str]]] = {}
+        self._candidate_cache: Dict[str, _CandidateSet] = {}
+        self._catalog_cache: Dict[str, Dict[str, str]] = {}
         self._ensure_tables()
 
     # ------------------------------------------------------------------
@@ -45,17 +71,45 @@ class CanonicalStore:
     def search(self, dim: str, token: str) -> List[CanonicalCandidate]:
         if not token:
             return []
-        values = self._load_candidates(dim)
-        matches: List[FuzzyMatch] = self._matcher.rank(token, values)
-        existing = self._lookup_mapping(dim)
-        return [
-            CanonicalCandidate(
-                candidate=m.candidate,
-                score=m.score,
-                canonical=existing.get(_normalise(m.candidate)),
+        return self.search_many(dim, [token])[0]
+
+    def search_many(self, dim: str, tokens: Sequence[str]) -> List[List[CanonicalCandidate]]:
+        """Search *dim* for every token, returning one result list per token.
+
+        The version, mapping and candidate index are fetched once for the
+        whole batch rather than once per token.
+        """
+
+        version = self.get_version()
+        mapping = self._mapping_for(dim, version)
+        candidates: Optional[_CandidateSet] = None
+        results: List[List[CanonicalCandidate]] = []
+        for token in tokens:
+            if not token:
+                results.append([])
+                continue
+            # A token that is already a promoted synonym resolves exactly; offer
+            # its canonical as the single candidate instead of fuzzy ranking.
+            canonical = mapping.get(_normalise(token))
+            if canonical is not None:
+                results.append(
+                    [CanonicalCandidate(candidate=canonical, score=1.0, canonical=canonical)]
+                )
+                continue
+            if candidates is None:
+                candidates = self._candidate_set(dim, version)
+            matches: List[FuzzyMatch] = self._matcher.rank_indexed(token, candidates.index)
+            results.append(
+                [
+                    CanonicalCandidate(
+                        candidate=m.candidate,
+                        score=m.score,
+                        canonical=candidates.canonicals.get(m.candidate),
+                    )
+                    for m in matches
+                ]
             )
-            for m in matches
-        ]
+        return results
 
     def promote(
         self,
@@ -69,41 +123,74 @@ class CanonicalStore:
         now = datetime.now(timezone.utc)
         promoter = promoted_by or "admin"
         score_value = float(score) if score is not None else 1.0
-        with self._connect() as conn:
-            existing = conn.execute(
-                "SELECT id FROM canonical_map WHERE dim = ? AND lower(synonym) = lower(?)",
-                [dim, synonym],
-            ).fetchone()
-            if existing:
+        # Serialise promotions so the upsert and version bump stay atomic.
+        with self._write_lock, self._connect() as conn:
+            conn.execute("BEGIN TRANSACTION")
+            try:
                 conn.execute(
                     """
-                    UPDATE canonical_map
-                    SET synonym = ?,
-                        canonical = ?,
-                        score = ?,
-                        promoted_by = ?,
-                        promoted_at = ?
-                    WHERE id = ?
+                    INSERT INTO canonical_map
+                        (dim, synonym, synonym_key, canonical, score, promoted_by, promoted_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (dim, synonym_key) DO UPDATE
+                    SET synonym = excluded.synonym,
+                        canonical = excluded.canonical,
+                        score = excluded.score,
+                        promoted_by = excluded.promoted_by,
+                        promoted_at = excluded.promoted_at
                     """,
-                    [synonym, canonical, score_value, promoter, now, int(existing[0])],
+                    [dim, synonym, _normalise(synonym), canonical, score_value, promoter, now],
                 )
-            else:
-                conn.execute(
-                    """
-                    INSERT INTO canonical_map (dim, synonym, canonical, score, promoted_by, promoted_at)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                    """,
-                    [dim, synonym, canonical, score_value, promoter, now],
-                )
-            version = self._bump_version(conn)
+                version = self._bump_version(conn)
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        self._mapping_cache.clear()
+        self._candidate_cache.clear()
+        self._matcher.invalidate()
+        with self._version_changed:
+            self._promoted_version = version
+            self._version_changed.notify_all()
         return version
 
     def get_version(self) -> int:
-        with self._connect() as conn:
-            row = conn.execute(
-                "SELECT v FROM canonical_meta WHERE k = 'version'"
-            ).fetchone()
-        return int(row[0]) if row else 1
+        rows = self._fetch("SELECT v FROM canonical_meta WHERE k = 'version'")
+        return int(rows[0][0]) if rows else 1
+
+    def wait_for_promotion(self, version: int, timeout: float) -> bool:
+        """Block until this store promotes past *version* or *timeout* elapses.
+
+        Returns whether such a promotion happened; ``wake_waiters`` ends the
+        wait early without one.
+        """
+
+        with self._version_changed:
+            if self._promoted_version <= version:
+                self._version_changed.wait(timeout)
+            return self._promoted_version > version
+
+    def wake_waiters(self) -> None:
+        with self._version_changed:
+            self._version_changed.notify_all()
+
+    def refresh_candidates(self, dim: Optional[str] = None) -> None:
+        """Reload catalog values for *dim* (or every dimension) on next search.
+
+        Promotions refresh synonyms automatically; call this after the
+        underlying fact table changes.
+        """
+
+        if dim is None:
+            self._catalog_cache.clear()
+            self._candidate_cache.clear()
+        else:
+            self._catalog_cache.pop(dim, None)
+            self._candidate_cache.pop(dim, None)
+
+    @property
+    def db_path(self) -> Path:
+        return Path(self._executor.db_path)
 
     def dimensions(self) -> List[str]:
         return list(self._semantic.dimensions.keys())
@@ -117,89 +204,151 @@ class CanonicalStore:
     def load_mappings(self) -> Dict[str, Dict[str, Dict[str, float]]]:
         with self._connect() as conn:
             rows = conn.execute(
-                "SELECT dim, synonym, canonical, score FROM canonical_map"
+                "SELECT dim, synonym_key, canonical, COALESCE(score, 0.0) FROM canonical_map"
             ).fetchall()
         mappings: Dict[str, Dict[str, Dict[str, float]]] = {}
-        for dim, synonym, canonical, score in rows:
-            dim_map = mappings.setdefault(dim, {})
-            dim_map[_normalise(str(synonym))] = {
-                "canonical": str(canonical),
-                "score": float(score or 0.0),
-            }
+        for dim, key, canonical, score in rows:
+            dim_map = mappings.get(dim)
+            if dim_map is None:
+                dim_map = mappings[dim] = {}
+            dim_map[key] = {"canonical": canonical, "score": score}
         return mappings
 
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
     def _connect(self) -> duckdb.DuckDBPyConnection:
-        return duckdb.connect(str(self._db_path))
+        """Return a cursor on the executor's live connection.
+
+        Cursors share the executor's database instance (catalog and buffer
+        pool) while giving each operation, and each thread, its own handle.
+        """
+
+        return self._executor.connection.cursor()
+
+    def _fetch(self, sql: str, *params: str) -> List[tuple]:
+        """Run *sql* with bound *params* on a short-lived cursor."""
+
+        with self._connect() as conn:
+            return conn.execute(sql, list(params)).fetchall()
 
     def _ensure_tables(self) -> None:
+        # DuckDB cannot build an index over rows changed in the same
+        # transaction, so rows and indexes migrate in two transactions.  Each
+        # rolls back as a whole and both are safe to rerun.
         with self._connect() as conn:
-            conn.execute("CREATE SEQUENCE IF NOT EXISTS canonical_map_id_seq START 1")
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS canonical_map (
-                    id BIGINT DEFAULT nextval('canonical_map_id_seq'),
-                    dim TEXT NOT NULL,
-                    synonym TEXT NOT NULL,
-                    canonical TEXT NOT NULL,
-                    score DOUBLE DEFAULT 1.0,
-                    promoted_by TEXT,
-                    promoted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    PRIMARY KEY (id)
-                )
-                """
-            )
-            conn.execute(
-                "CREATE UNIQUE INDEX IF NOT EXISTS canonical_map_dim_syn ON canonical_map(dim, synonym)"
+            _in_transaction(conn, self._migrate_rows)
+            _in_transaction(conn, self._migrate_indexes)
+
+    def _migrate_rows(self, conn: duckdb.DuckDBPyConnection) -> None:
+        conn.execute("CREATE SEQUENCE IF NOT EXISTS canonical_map_id_seq START 1")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS canonical_map (
+                id BIGINT DEFAULT nextval('canonical_map_id_seq'),
+                dim TEXT NOT NULL,
+                synonym TEXT NOT NULL,
+                synonym_key TEXT,
+                canonical TEXT NOT NULL,
+                score DOUBLE DEFAULT 1.0,
+                promoted_by TEXT,
+                promoted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (id)
             )
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS canonical_meta (
-                    k TEXT PRIMARY KEY,
-                    v BIGINT NOT NULL
-                )
-                """
+            """
+        )
+        # Tables created before synonym_key existed get the column and
+        # their keys backfilled here.
+        conn.execute("ALTER TABLE canonical_map ADD COLUMN IF NOT EXISTS synonym_key TEXT")
+        conn.execute(
+            f"UPDATE canonical_map SET synonym_key = {_SYNONYM_KEY_SQL} WHERE synonym_key IS NULL"
+        )
+        # Older tables were unique on the raw synonym, so " mk1" and "MK1" could
+        # coexist; keep only the latest promotion of each key.
+        conn.execute(
+            """
+            DELETE FROM canonical_map WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, row_number() OVER (
+                        PARTITION BY dim, synonym_key
+                        ORDER BY promoted_at DESC NULLS LAST, id DESC
+                    ) AS rank
+                    FROM canonical_map
+                ) WHERE rank > 1
             )
-            conn.execute(
-                "INSERT INTO canonical_meta(k, v) VALUES ('version', 1) ON CONFLICT (k) DO NOTHING"
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS canonical_meta (
+                k TEXT PRIMARY KEY,
+                v BIGINT NOT NULL
             )
+            """
+        )
+        conn.execute(
+            "INSERT INTO canonical_meta(k, v) VALUES ('version', 1) ON CONFLICT (k) DO NOTHING"
+        )
+
+    def _migrate_indexes(self, conn: duckdb.DuckDBPyConnection) -> None:
+        # Unique keys imply unique synonyms, so the old (dim, synonym) index is redundant.
+        conn.execute("DROP INDEX IF EXISTS canonical_map_dim_syn")
+        conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS canonical_map_dim_key ON canonical_map(dim, synonym_key)"
+        )
+        # Every read path filters by dim alone, which the composite index above cannot serve.
+        conn.execute("CREATE INDEX IF NOT EXISTS canonical_map_dim ON canonical_map(dim)")
+
+    def _candidate_set(self, dim: str, version: int) -> _CandidateSet:
+        cached = self._candidate_cache.get(dim)
+        if cached is not None and cached.version == version:
+            return cached
+        originals = self._load_candidates(dim)
+        mapping = self._mapping_for(dim, version)
+        canonicals = {}
+        for original in originals:
+            canonical = mapping.get(_normalise(original))
+            if canonical is not None:
+                canonicals[original] = canonical
+        # Each dimension keeps its own index, so alternating searches across
+        # dimensions never refit the matcher.
+        index = self._matcher.build_index(originals)
+        candidate_set = _CandidateSet(version, originals, canonicals, index)
+        self._candidate_cache[dim] = candidate_set
+        return candidate_set
 
     def _load_candidates(self, dim: str) -> List[str]:
-        dimension = self._dimension(dim)
-        table = self._semantic.table
-        column_sql = self._dimension_sql(dimension)
-        sql = (
-            f"SELECT DISTINCT {column_sql} AS value "
-            f"FROM {table} "
-            f"WHERE {column_sql} IS NOT NULL "
-            f"LIMIT {self._max_candidates}"
+        catalog = self._catalog_values(dim)
+        # Synonyms and canonicals deduplicated case-insensitively by DuckDB's
+        # hash aggregate; a synonym wins over a canonical spelled differently.
+        rows = self._fetch(
+            "SELECT lower(value) AS key, arg_min(value, src) FROM ("
+            "SELECT synonym AS value, 1 AS src FROM canonical_map WHERE dim = $1 AND synonym <> '' "
+            "UNION ALL SELECT canonical, 2 FROM canonical_map WHERE dim = $1 AND canonical <> ''"
+            ") GROUP BY key ORDER BY min(src)",
+            dim,
         )
-        values: List[str] = []
-        with self._connect() as conn:
-            rows = conn.execute(sql).fetchall()
-            values.extend(str(row[0]) for row in rows if row and row[0] is not None)
-            synonym_rows = conn.execute(
-                "SELECT synonym FROM canonical_map WHERE dim = ?",
-                [dim],
-            ).fetchall()
-            canonical_rows = conn.execute(
-                "SELECT canonical FROM canonical_map WHERE dim = ?",
-                [dim],
-            ).fetchall()
-        values.extend(str(row[0]) for row in synonym_rows if row and row[0])
-        values.extend(str(row[0]) for row in canonical_rows if row and row[0])
-        # deduplicate while preserving order
-        seen = set()
-        deduped: List[str] = []
-        for value in values:
-            key = value.lower()
-            if key in seen:
-                continue
-            seen.add(key)
-            deduped.append(value)
-        return deduped
+        # Catalog spellings take precedence over mapped ones.
+        return list(catalog.values()) + [value for key, value in rows if key not in catalog]
+
+    def _catalog_values(self, dim: str) -> Dict[str, str]:
+        """Return the dimension's distinct catalog values keyed by lower-cased value."""
+
+        # The distinct scan over the fact table dominates candidate loading and
+        # its result does not depend on the store version, so it is cached
+        # until ``refresh_candidates`` drops it.
+        values = self._catalog_cache.get(dim)
+        if values is None:
+            self._dimension(dim)  # raises ValueError for unknown dims
+            column_sql = self._dim_sql[dim]
+            rows = self._fetch(
+                "SELECT lower(value) AS key, min(value) FROM ("
+                f"SELECT DISTINCT CAST({column_sql} AS VARCHAR) AS value FROM {self._semantic.table} "
+                f"WHERE {column_sql} IS NOT NULL LIMIT {self._max_candidates}"
+                ") GROUP BY key",
+            )
+            values = self._catalog_cache[dim] = dict(rows)
+        return values
 
     def _dimension(self, dim: str) -> SemanticDimension:
         try:
@@ -216,27 +365,45 @@ class CanonicalStore:
         return f'"{column}"'
 
     def _lookup_mapping(self, dim: str) -> Dict[str, str]:
-        with self._connect() as conn:
-            rows = conn.execute(
-                "SELECT synonym, canonical FROM canonical_map WHERE dim = ?",
-                [dim],
-            ).fetchall()
-        return {_normalise(str(synonym)): str(canonical) for synonym, canonical in rows}
+        return self._mapping_for(dim, self.get_version())
+
+    def _mapping_for(self, dim: str, version: int) -> Dict[str, str]:
+        # Mappings only change when the version is bumped, so each dim keeps the
+        # mapping of the last version seen; a newer version, including one
+        # bumped through another store, replaces it.
+        cached = self._mapping_cache.get(dim)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        rows = self._fetch("SELECT synonym_key, canonical FROM canonical_map WHERE dim = $1", dim)
+        mapping = dict(rows)
+        self._mapping_cache[dim] = (version, mapping)
+        return mapping
 
     def _bump_version(self, conn: duckdb.DuckDBPyConnection) -> int:
-        current = conn.execute(
-            "SELECT v FROM canonical_meta WHERE k = 'version'"
+        row = conn.execute(
+            "UPDATE canonical_meta SET v = v + 1 WHERE k = 'version' RETURNING v"
         ).fetchone()
-        if current:
-            next_value = int(current[0]) + 1
-            conn.execute(
-                "UPDATE canonical_meta SET v = ? WHERE k = 'version'",
-                [next_value],
-            )
-            return next_value
+        if row:
+            return int(row[0])
         conn.execute("INSERT INTO canonical_meta(k, v) VALUES ('version', 1)")
         return 1
 
 
+# SQL twin of ``_normalise``, used to backfill ``synonym_key`` on older tables.
+_SYNONYM_KEY_SQL = "lower(trim(synonym, ' \t\n\r\x0b\x0c'))"
+
+
+def _in_transaction(
+    conn: duckdb.DuckDBPyConnection, step: Callable[[duckdb.DuckDBPyConnection], None]
+) -> None:
+    conn.execute("BEGIN TRANSACTION")
+    try:
+        step(conn)
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
 def _normalise(value: str) -> str:
     return value.strip().lower()
@@ -1,15 +1,22 @@
 """Background watcher that keeps canonical caches in sync."""
 from __future__ import annotations
 
+import os
 import threading
-from typing import Optional
+from pathlib import Path
+from typing import Optional, Tuple
 
 from .store import CanonicalStore
 from ..resolver.canonicalizer import Canonicalizer
 
 
 class CanonicalWatcher:
-    """Poll the canonical_map version and refresh caches on change."""
+    """Refresh caches when the canonical_map version changes.
+
+    Promotions made through the store wake the watcher immediately; writes
+    from elsewhere are picked up by checking the database files every
+    ``interval`` seconds.
+    """
 
     def __init__(
         self,
@@ -23,6 +30,7 @@ class CanonicalWatcher:
         self._interval = interval
         self._thread: Optional[threading.Thread] = None
         self._stop = threading.Event()
+        self._fingerprint: Tuple[Optional[Tuple[int, int]], ...] = ()
 
     def start(self) -> None:
         if self._thread and self._thread.is_alive():
@@ -36,6 +44,7 @@ class CanonicalWatcher:
         if not self._thread:
             return
         self._stop.set()
+        self._store.wake_waiters()
         self._thread.join(timeout=self._interval * 2)
         self._thread = None
 
@@ -43,14 +52,40 @@ class CanonicalWatcher:
     # Internals
     # ------------------------------------------------------------------
     def _initial_load(self) -> None:
+        self._fingerprint = self._file_fingerprint()
         version = self._store.get_version()
         mappings = self._store.load_mappings()
         self._canonicalizer.load(mappings, version)
 
     def _run(self) -> None:
-        while not self._stop.wait(self._interval):
+        while not self._stop.is_set():
+            promoted = self._store.wait_for_promotion(self._canonicalizer.version, self._interval)
+            if self._stop.is_set():
+                break
+            # Without a local promotion, only ask DuckDB for the version once
+            # the database files moved.
+            fingerprint = self._file_fingerprint()
+            if not promoted and fingerprint == self._fingerprint:
+                continue
+            self._fingerprint = fingerprint
             version = self._store.get_version()
             if version == self._canonicalizer.version:
                 continue
             mappings = self._store.load_mappings()
             self._canonicalizer.load(mappings, version)
+
+    def _file_fingerprint(self) -> Tuple[Optional[Tuple[int, int]], ...]:
+        """Return (mtime, size) of the database file and its write-ahead log."""
+
+        path = Path(self._store.db_path)
+        stats = []
+        # Committed changes land in the WAL first and reach the main file only
+        # at checkpoint time, so both have to be watched.
+        for candidate in (path, path.with_name(path.name + ".wal")):
+            try:
+                stat = os.stat(candidate)
+            except OSError:
+                stats.append(None)
+            else:
+                stats.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(stats)
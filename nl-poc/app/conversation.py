@@ -3,9 +3,13 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from datetime import date
-from typing import Any, Dict, List, Optional, Tuple
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Pattern, Tuple, Union
 
 import re
+import sys
+import threading
 from copy import deepcopy
 
 from .planner import build_plan_rule_based
@@ -27,74 +31,204 @@ from .patterns import (
 )
 
 
-# Dimension canonical names that map to the semantic model.
-_DIMENSION_ALIASES = {
-    "area": {
+# Per-request and per-session records: slots drop the per-instance __dict__
+# where the interpreter supports them on dataclasses.
+_DATACLASS_SLOTS: Dict[str, bool] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+# Dimension canonical names that map to the semantic model.  Read-only so
+# the tables (and the memoised lookups built from them) cannot drift.
+_DIMENSION_ALIASES: Mapping[str, FrozenSet[str]] = MappingProxyType({
+    "area": frozenset({
         "area",
         "areas",
         "area name",
         "neighborhood",
         "neighborhoods",
-    },
-    "weapon": {"weapon", "weapons", "weapon type", "weapon types", "weapon category"},
-    "crime_type": {
+    }),
+    "weapon": frozenset({"weapon", "weapons", "weapon type", "weapon types", "weapon category"}),
+    "crime_type": frozenset({
         "crime",
         "crimes",
         "crime type",
         "crime types",
         "offense",
         "offenses",
-    },
-    "premise": {"premise", "premises", "location type", "location"},
-    "vict_age": {"age", "ages", "victim age", "victim ages"},
-}
+    }),
+    "premise": frozenset({"premise", "premises", "location type", "location"}),
+    "vict_age": frozenset({"age", "ages", "victim age", "victim ages"}),
+})
 
-_DIMENSION_TYPES = {
+_DIMENSION_TYPES: Mapping[str, str] = MappingProxyType({
     "area": "category",
     "weapon": "category",
     "crime_type": "category",
     "premise": "category",
     "vict_age": "number",
+})
+
+# Every alias and canonical name mapped straight to its canonical dimension.
+# Keys are interned so probes with interned keys (see ``_dimension_key``)
+# match on identity.
+_ALIAS_TO_CANONICAL: Mapping[str, str] = MappingProxyType({
+    sys.intern(alias): sys.intern(canonical)
+    for canonical, synonyms in _DIMENSION_ALIASES.items()
+    for alias in (*synonyms, canonical)
+})
+
+# Pydantic v2 entry points when available: the v1-style parse_obj/dict
+# aliases produce the same result but go through a deprecation warning on
+# every call.  The lightweight fallback models only provide parse_obj/dict.
+_parse_nql = getattr(NQLQuery, "model_validate", None) or NQLQuery.parse_obj
+_dump_nql = getattr(NQLQuery, "model_dump", None) or NQLQuery.dict
+
+_NON_ALPHA_PATTERN = re.compile(r"[^a-z\s]")
+_NON_ALPHA_DELETE = {
+    code: None for code in range(128) if not (chr(code).islower() or chr(code).isspace())
+}
+# Fixed time/trend phrases found in one scan of the utterance.  No phrase can
+# start inside another, so non-overlapping matching sees every one of them.
+_TIME_TRIGGER_PATTERN = re.compile(
+    r"last quarter|last\s+(?P<months>\d{1,2})\s+months|(?P<year>last year)"
+    r"|(?P<half>past (?:6|six) months)|last month|trend"
+)
+# Relative-month phrases by precedence (lower wins regardless of position)
+# and the window length each one implies.
+_RELATIVE_MONTHS_RANK = {"months": 0, "year": 1, "half": 2}
+_RELATIVE_MONTHS_FIXED = {"year": 12, "half": 6}
+# Necessary conditions for the follow-up edits in ``rewrite_followup``: each
+# matcher family (including extract_time_range for "time") can only fire when
+# the utterance contains one of its substrings, or a digit for "range" and
+# "time".  Utterances with none of them leave the query unchanged.
+_MATCHER_TRIGGERS: Dict[str, FrozenSet[str]] = {
+    "by": frozenset({"dimension"}),
+    "top": frozenset({"top_n"}),
+    "highest": frozenset({"top_n"}),
+    "best": frozenset({"top_n"}),
+    "bottom": frozenset({"top_n"}),
+    "lowest": frozenset({"top_n"}),
+    "worst": frozenset({"top_n"}),
+    "filter out": frozenset({"removal"}),
+    "exclude": frozenset({"removal"}),
+    "remove": frozenset({"removal", "clear"}),
+    "drop": frozenset({"removal", "clear"}),
+    "include": frozenset({"addition"}),
+    "only": frozenset({"addition"}),
+    "just": frozenset({"addition"}),
+    "look": frozenset({"addition"}),
+    "consider": frozenset({"addition"}),
+    "focus": frozenset({"addition"}),
+    "show": frozenset({"addition"}),
+    "switch": frozenset({"addition"}),
+    "change": frozenset({"addition"}),
+    "swap": frozenset({"addition"}),
+    "reset": frozenset({"clear"}),
+    "clear": frozenset({"clear"}),
+    "all": frozenset({"clear"}),
+    "everything": frozenset({"clear"}),
+    "last": frozenset({"time"}),
+    "past": frozenset({"time"}),
+    "this": frozenset({"time"}),
+    "ytd": frozenset({"time"}),
+    "year to date": frozenset({"time"}),
+    "trend": frozenset({"time"}),
+    "mom": frozenset({"mom"}),
+    "month over month": frozenset({"mom"}),
 }
+_DIGIT_TRIGGERS = frozenset({"range", "time"})
+# Zero-width so overlapping triggers are all seen in a single scan.  No
+# trigger is a prefix of another, so at most one can match at any position.
+_MATCHER_TRIGGER_PATTERN = re.compile(
+    "(?=(" + "|".join(re.escape(trigger) for trigger in _MATCHER_TRIGGERS) + r"|\d))"
+)
+_NEW_ENTITY_PREPOSITION_PATTERN = re.compile(r"\b(?:in|for|at|within|across)\s+[a-z]")
+
 
+def _dimension_key(candidate: str) -> str:
+    """Return the interned alias-table key for a raw dimension phrase."""
 
-def _normalise_text(value: str) -> str:
-    """Deprecated: Use patterns.normalize_text instead."""
-    return normalize_text(value)
+    candidate_norm = " ".join(candidate.lower().split())
+    if candidate_norm.isascii():
+        candidate_norm = candidate_norm.translate(_NON_ALPHA_DELETE)
+    else:
+        # translate() cannot delete "everything else", so non-ASCII input
+        # keeps the regex.
+        candidate_norm = _NON_ALPHA_PATTERN.sub("", candidate_norm)
+    return sys.intern(candidate_norm.strip())
 
 
+# Pure functions of the phrase; the same utterance is resolved by
+# assess_ambiguity, rewrite_followup and apply_clarification_answer.
+@lru_cache(maxsize=2048)
 def _resolve_dimension(candidate: str) -> Optional[str]:
-    candidate_norm = _normalise_text(candidate)
-    candidate_norm = re.sub(r"[^a-z\s]", "", candidate_norm).strip()
+    candidate_norm = _dimension_key(candidate)
     if not candidate_norm:
         return None
-    for canonical, synonyms in _DIMENSION_ALIASES.items():
-        if candidate_norm in synonyms or candidate_norm == canonical:
-            return canonical
-    return None
+    return _ALIAS_TO_CANONICAL.get(candidate_norm)
+
 
+def _substring_keywords(keywords: Iterable[str]) -> Tuple[str, ...]:
+    """Drop keywords that contain another keyword.
 
+    The scans below only ask whether *any* keyword occurs in the utterance,
+    so "incidents" is redundant next to "incident".
+    """
+
+    unique = set(keywords)
+    return tuple(
+        sorted(
+            keyword
+            for keyword in unique
+            if not any(other != keyword and other in keyword for other in unique)
+        )
+    )
+
+
+_SELF_CONTAINED_METRIC_KEYWORDS = _substring_keywords(
+    ["incident", "crime", "case", "event", "report", "count", "total", "number"]
+)
+_SELF_CONTAINED_TIME_KEYWORDS = _substring_keywords([
+    "last year", "this year", "ytd", "year to date",
+    "last month", "this month", "last quarter",
+    "last 6 months", "last 12 months", "past 6 months",
+    "2024", "2025", "q1", "q2", "q3", "q4"
+])
+
+
+@lru_cache(maxsize=2048)
 def _is_self_contained_query(utterance: str) -> bool:
     """Check if utterance is a complete query (not a modification of previous)."""
     lowered = utterance.lower()
 
     # Check for metric mentions
-    metric_keywords = ["incident", "crime", "case", "event", "report", "count", "total", "number"]
-    has_metric = any(keyword in lowered for keyword in metric_keywords)
+    has_metric = any(keyword in lowered for keyword in _SELF_CONTAINED_METRIC_KEYWORDS)
 
     # Check for time references
-    time_keywords = [
-        "last year", "this year", "ytd", "year to date",
-        "last month", "this month", "last quarter",
-        "last 6 months", "last 12 months", "past 6 months",
-        "2024", "2025", "q1", "q2", "q3", "q4"
-    ]
-    has_time = any(keyword in lowered for keyword in time_keywords)
+    has_time = any(keyword in lowered for keyword in _SELF_CONTAINED_TIME_KEYWORDS)
 
     # Self-contained if it has both metric and time (not just a modification)
     return has_metric and has_time
 
 
+def _index_filters(filters: List[Filter]) -> Dict[str, List[Filter]]:
+    """Group *filters* by field, keeping their original order within each field."""
+
+    index: Dict[str, List[Filter]] = {}
+    for filt in filters:
+        index.setdefault(sys.intern(filt.field), []).append(filt)
+    return index
+
+
+def _matcher_families(lowered: str) -> FrozenSet[str]:
+    """Return the ``rewrite_followup`` matcher families *lowered* could trigger."""
+
+    families: set = set()
+    for match in _MATCHER_TRIGGER_PATTERN.finditer(lowered):
+        families |= _MATCHER_TRIGGERS.get(match.group(1), _DIGIT_TRIGGERS)
+    return frozenset(families)
+
+
+@lru_cache(maxsize=2048)
 def _extract_dimension_candidate(utterance: str) -> Optional[str]:
     """Deprecated: Use patterns.match_dimension_change instead."""
     return match_dimension_change(utterance)
@@ -105,9 +239,20 @@ def _first_day_of_month(anchor: date) -> date:
 
 
 def _shift_month(anchor: date, delta: int) -> date:
-    year = anchor.year + ((anchor.month - 1 + delta) // 12)
-    month = (anchor.month - 1 + delta) % 12 + 1
-    return date(year, month, 1)
+    year_delta, month_index = divmod(anchor.month - 1 + delta, 12)
+    return date(anchor.year + year_delta, month_index + 1, 1)
+
+
+@lru_cache(maxsize=512)
+def _parse_iso_date(value: str) -> date:
+    return date.fromisoformat(value)
+
+
+@lru_cache(maxsize=512)
+def _relative_months_bounds(end: date, n: int) -> Tuple[str, str]:
+    """Return ISO ``[start, end]`` for the *n* months ending at *end*."""
+
+    return _shift_month(end, -n).isoformat(), end.isoformat()
 
 
 def _previous_month(anchor: date) -> date:
@@ -129,23 +274,28 @@ def _previous_quarter(anchor: date) -> Tuple[date, date]:
 
 
 def _replace_month_filter(nql: NQLQuery, op: str, value: Any) -> None:
-    for filt in nql.filters:
-        if filt.field == "month":
-            filt.op = op
-            filt.value = value
-            filt.type = "date"
-            return
+    month_filter = next((filt for filt in nql.filters if filt.field == "month"), None)
+    _write_month_filter(nql, month_filter, op, value)
+
+
+def _write_month_filter(
+    nql: NQLQuery, month_filter: Optional[Filter], op: str, value: Any
+) -> None:
+    if month_filter is not None:
+        month_filter.op = op
+        month_filter.value = value
+        month_filter.type = "date"
+        return
     nql.filters.insert(0, Filter(field="month", op=op, value=value, type="date"))
 
 
 def _ensure_trend_group_by(nql: NQLQuery) -> None:
-    seen = set(nql.group_by)
-    if "month" not in seen:
+    if "month" not in nql.group_by:
         nql.group_by.insert(0, "month")
 
 
 def _set_relative_months_window(
-    nql: NQLQuery, n: int, anchor_end: Optional[str]
+    nql: NQLQuery, n: int, anchor_end: Optional[str], *, today: Optional[date] = None
 ) -> None:
     window = nql.time.window
     window.type = "relative_months"
@@ -154,18 +304,23 @@ def _set_relative_months_window(
     window.end = anchor_end
     window.exclusive_end = False
     end_str = anchor_end
-    if not end_str:
-        # fall back to existing month filter upper bound if present
-        for filt in nql.filters:
-            if filt.field == "month" and isinstance(filt.value, list) and len(filt.value) == 2:
-                end_str = filt.value[1]
-                break
-    if end_str:
-        end_date = date.fromisoformat(end_str)
-    else:
-        end_date = date.today()
-    start_date = _shift_month(end_date, -n)
-    _replace_month_filter(nql, "between", [start_date.isoformat(), end_date.isoformat()])
+    # One pass finds both the month filter to overwrite and, without an
+    # anchor, the first month range whose upper bound serves as the end.
+    month_filter: Optional[Filter] = None
+    for filt in nql.filters:
+        if filt.field != "month":
+            continue
+        if month_filter is None:
+            month_filter = filt
+        if end_str:
+            break
+        if isinstance(filt.value, list) and len(filt.value) == 2:
+            end_str = filt.value[1]
+            break
+    # Anchors recur across a session's turns, so parsing and the month
+    # arithmetic are memoised on the anchor.
+    end_date = _parse_iso_date(end_str) if end_str else (today or date.today())
+    _write_month_filter(nql, month_filter, "between", list(_relative_months_bounds(end_date, n)))
 
 
 def _set_single_month_window(nql: NQLQuery, start: date) -> None:
@@ -214,24 +369,33 @@ def rewrite_followup(
         raise ValueError("conversation_state cannot be empty for follow-up rewrites")
 
     today = today or date.today()
+    # Lowercased once here and handed to every helper below.
+    lowered = sys.intern(utterance.lower())
     classification = _classify_topic_shift(
-        conversation_state, utterance, force_fresh=force_fresh
+        conversation_state, utterance, lowered=lowered, force_fresh=force_fresh
     )
     if classification["is_fresh_query"]:
         fresh = _build_fresh_query(
             conversation_state,
             utterance,
+            lowered=lowered,
             today=today,
             reasons=classification["reasons"],
         )
-        return fresh.dict()
+        return _dump_nql(fresh)
 
-    working = NQLQuery.parse_obj(deepcopy(conversation_state))
+    # Parsing builds fresh models and containers; the only values shared
+    # with ``conversation_state`` are filter values, which are reassigned
+    # below rather than mutated in place.
+    working = _parse_nql(conversation_state)
     working.provenance.utterance = utterance
 
-    lowered = utterance.lower()
+    # One scan decides which matchers below can possibly fire.
+    families = _matcher_families(lowered)
+    if not families:
+        return _dump_nql(working)
 
-    candidate_dimension = _extract_dimension_candidate(utterance)
+    candidate_dimension = _extract_dimension_candidate(utterance) if "dimension" in families else None
     if candidate_dimension:
         resolved = _resolve_dimension(candidate_dimension)
         if resolved:
@@ -242,7 +406,7 @@ def rewrite_followup(
             working.group_by = ["month"] if has_month else []
 
     # Detect top-N patterns like "top 5", "bottom 3 areas"
-    top_n = match_top_n(utterance)
+    top_n = match_top_n(utterance, lowered=lowered) if "top_n" in families else None
     if top_n:
         # Set limit
         working.limit = top_n.k
@@ -261,21 +425,35 @@ def rewrite_followup(
             if top_n.dimension not in working.group_by:
                 working.group_by = [top_n.dimension]
 
+    # Field -> filters lookup for the edits below.  ``working.filters`` stays
+    # authoritative (its order is preserved in the output); the index is
+    # rebuilt whenever a block replaces the list.
+    filter_index = _index_filters(working.filters)
+
     # Detect filter removals like "drop Central", "remove Hollywood and Downtown"
-    filter_removal = match_filter_removal(utterance)
+    filter_removal = match_filter_removal(utterance, lowered=lowered) if "removal" in families else None
+    removal_field = None
     if filter_removal:
-        removal_values = [normalize_text(v) for v in filter_removal.values]
-        field = working.dimensions[0] if working.dimensions else "area"
-
-        # Try to remove from existing filters
-        for filt in working.filters[:]:  # Use slice to allow modification during iteration
+        removal_field = working.dimensions[0] if working.dimensions else "area"
+    # Only filters on the removal field are touched, so skip the pass when
+    # there are none.
+    if removal_field is not None and removal_field != "month" and removal_field in filter_index:
+        removal_values = frozenset(normalize_text(v) for v in filter_removal.values)
+        field = removal_field
+
+        # Try to remove from existing filters in one pass; the list is only
+        # rebuilt when a filter is actually dropped.
+        kept: List[Filter] = []
+        filters_dirty = False
+        for filt in working.filters:
             if filt.field == field and filt.field != "month":
                 if isinstance(filt.value, list):
                     # Remove values from list (for "in" operator)
                     remaining = [v for v in filt.value if normalize_text(v) not in removal_values]
                     if len(remaining) == 0:
                         # All values removed, delete the filter
-                        working.filters.remove(filt)
+                        filters_dirty = True
+                        continue
                     elif len(remaining) != len(filt.value):
                         # Some values removed, update the filter
                         if len(remaining) == 1:
@@ -290,33 +468,41 @@ def rewrite_followup(
                         if filt.op == "=":
                             filt.op = "!="
                         else:
-                            working.filters.remove(filt)
+                            filters_dirty = True
+                            continue
+            kept.append(filt)
+        if filters_dirty:
+            working.filters = kept
+            filter_index = _index_filters(kept)
 
     # Detect filter modifications - "include" adds to existing, "only/just" replaces
-    filter_addition = match_filter_addition(utterance)
+    filter_addition = match_filter_addition(utterance, lowered=lowered) if "addition" in families else None
     if filter_addition:
         # Check if this is a time reference before treating as a dimension filter
         value_str = " and ".join(filter_addition.values)
         time_check = extract_time_range(value_str, today=today)
 
         if not time_check:
-            values = filter_addition.values
             field = None
             if working.dimensions:
                 field = working.dimensions[0]
             if not field:
                 field = "area"
+            field = sys.intern(field)
+            values = [value.title() for value in filter_addition.values]
             filt_type = _DIMENSION_TYPES.get(field, "category")
 
             if filter_addition.is_include:
                 # Include: Add to existing filter values
-                existing_filter = next((f for f in working.filters if f.field == field and f.field != "month"), None)
+                existing_filter = filter_index[field][0] if field != "month" and field in filter_index else None
                 if existing_filter:
-                    # Merge with existing values
+                    # Merge with existing values, first occurrence wins
                     if isinstance(existing_filter.value, list):
-                        new_values = list(set(existing_filter.value + values))
+                        merged = dict.fromkeys(existing_filter.value)
                     else:
-                        new_values = list(set([existing_filter.value] + values))
+                        merged = dict.fromkeys([existing_filter.value])
+                    merged.update(dict.fromkeys(values))
+                    new_values = list(merged)
                     existing_filter.op = "in"
                     existing_filter.value = new_values
                 else:
@@ -327,24 +513,27 @@ def rewrite_followup(
                         working.filters.append(Filter(field=field, op="=", value=values[0], type=filt_type))
             else:
                 # Replace: Remove existing filters and add new one
-                working.filters = [f for f in working.filters if f.field != field or f.field == "month"]
+                if field != "month" and field in filter_index:
+                    working.filters = [f for f in working.filters if f.field != field]
                 if len(values) > 1:
                     working.filters.append(Filter(field=field, op="in", value=values, type=filt_type))
                 else:
                     working.filters.append(Filter(field=field, op="=", value=values[0], type=filt_type))
+            filter_index = _index_filters(working.filters)
 
     # Detect filter clear patterns like "reset filters", "show all areas"
-    clear_field = match_filter_clear(utterance)
+    clear_field = match_filter_clear(utterance, lowered=lowered) if "clear" in families else None
     if clear_field is not None:
         if clear_field == "":
             # Clear all dimension filters, preserve time filters
-            working.filters = [f for f in working.filters if f.field == "month"]
-        else:
+            if any(name != "month" for name in filter_index):
+                working.filters = list(filter_index.get("month", ()))
+        elif clear_field in filter_index:
             # Clear filters for specific field
             working.filters = [f for f in working.filters if f.field != clear_field]
 
     # Detect range filter patterns like "over 100", "between 50 and 100"
-    range_filter = match_range_filter(utterance)
+    range_filter = match_range_filter(utterance, lowered=lowered) if "range" in families else None
     if range_filter:
         # Determine the metric field from the current query
         # For now, default to "incidents" but could be inferred from working.metrics
@@ -355,7 +544,7 @@ def rewrite_followup(
         # Add numeric filter
         working.filters.append(
             Filter(
-                field=metric_field,
+                field=sys.intern(metric_field),
                 op=range_filter.op,
                 value=range_filter.value,
                 type="number"
@@ -363,37 +552,39 @@ def rewrite_followup(
         )
 
     # Time adjustments
+    triggers = set()
+    relative_rank = len(_RELATIVE_MONTHS_RANK)
+    relative_months = 0
+    time_matches = _TIME_TRIGGER_PATTERN.finditer(lowered) if "time" in families else ()
+    for match in time_matches:
+        kind = match.lastgroup
+        if kind is None:
+            triggers.add(match.group(0))
+        elif _RELATIVE_MONTHS_RANK[kind] < relative_rank:
+            # "last 6/12 months" are covered by the last-N-months match.
+            relative_rank = _RELATIVE_MONTHS_RANK[kind]
+            relative_months = _RELATIVE_MONTHS_FIXED.get(kind) or int(match.group("months"))
+
     anchor_end = working.time.window.end
     time_adjusted = False
-    if "last quarter" in lowered:
+    if "last quarter" in triggers:
         start, end_exclusive = _previous_quarter(today)
         _set_quarter_window(working, start, end_exclusive)
         time_adjusted = True
     else:
-        match_relative = re.search(r"last\s+(\d{1,2})\s+months", lowered)
-        if match_relative:
-            n = int(match_relative.group(1))
-            _set_relative_months_window(working, n, anchor_end)
-            time_adjusted = True
-        elif "last 6 months" in lowered:
-            _set_relative_months_window(working, 6, anchor_end)
-            time_adjusted = True
-        elif "last 12 months" in lowered or "last year" in lowered:
-            _set_relative_months_window(working, 12, anchor_end)
+        if relative_rank < len(_RELATIVE_MONTHS_RANK):
+            _set_relative_months_window(working, relative_months, anchor_end, today=today)
             time_adjusted = True
-        elif "past 6 months" in lowered or "past six months" in lowered:
-            _set_relative_months_window(working, 6, anchor_end)
-            time_adjusted = True
-        elif "last month" in lowered:
+        elif "last month" in triggers:
             if anchor_end:
-                end_date = date.fromisoformat(anchor_end)
+                end_date = _parse_iso_date(anchor_end)
             else:
                 end_date = today
             start = _previous_month(end_date)
             _set_single_month_window(working, start)
             time_adjusted = True
 
-    if not time_adjusted:
+    if not time_adjusted and "time" in families:
         time_range = extract_time_range(utterance, today=today)
         if time_range:
             if time_range.op == "=":
@@ -415,19 +606,19 @@ def rewrite_followup(
                 )
             time_adjusted = True
 
-    if "trend" in lowered:
+    if "trend" in triggers:
         working.intent = "trend"
         _ensure_trend_group_by(working)
 
     # MoM toggles
-    mom_toggle = match_mom_toggle(utterance)
+    mom_toggle = match_mom_toggle(utterance, lowered=lowered) if "mom" in families else None
     if mom_toggle is not None:
         _toggle_mom_compare(working, mom_toggle)
 
-    return working.dict()
+    return _dump_nql(working)
 
 
-@dataclass
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class ClarifierResult:
     needs_clarification: bool
     question: Optional[str] = None
@@ -443,8 +634,35 @@ def assess_ambiguity(
 
     if not conversation_state:
         return ClarifierResult(needs_clarification=False)
+    return _dimension_clarifier(_extract_dimension_candidate(utterance))
+
 
-    candidate_dimension = _extract_dimension_candidate(utterance)
+def analyze_followup(
+    conversation_state: Dict[str, Any],
+    utterance: str,
+    *,
+    today: Optional[date] = None,
+    force_fresh: bool = False,
+) -> Tuple[ClarifierResult, Optional[Dict[str, Any]]]:
+    """Clarify-or-rewrite a follow-up in one call.
+
+    Returns the clarifier result and, when no clarification is needed, the
+    merged NQL payload.  The clarifier check is skipped with ``force_fresh``
+    since a fresh query does not depend on the prior dimensions.  The
+    dimension candidate is memoised, so the rewrite reuses the clarifier's
+    extraction instead of repeating it.
+    """
+
+    clarification = ClarifierResult(needs_clarification=False)
+    if not force_fresh and conversation_state:
+        clarification = _dimension_clarifier(_extract_dimension_candidate(utterance))
+        if clarification.needs_clarification:
+            return clarification, None
+    merged = rewrite_followup(conversation_state, utterance, today=today, force_fresh=force_fresh)
+    return clarification, merged
+
+
+def _dimension_clarifier(candidate_dimension: Optional[str]) -> ClarifierResult:
     if candidate_dimension and not _resolve_dimension(candidate_dimension):
         suggestions = sorted(_DIMENSION_ALIASES.keys())[:4]
         question = "Which dimension should I break that out by?"
@@ -459,7 +677,7 @@ def assess_ambiguity(
     return ClarifierResult(needs_clarification=False)
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class PendingClarification:
     utterance: str
     question: str
@@ -468,7 +686,7 @@ class PendingClarification:
     context: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class ConversationState:
     session_id: str
     last_nql: Optional[Dict[str, Any]] = None
@@ -476,27 +694,77 @@ class ConversationState:
     pending: Optional[PendingClarification] = None
 
 
+_ATOMIC_TYPES = frozenset({str, int, float, bool, type(None)})
+
+
+def _fast_clone(value: Any) -> Any:
+    """Deep-copy a JSON-like tree without ``deepcopy``'s memo bookkeeping.
+
+    NQL payloads and plans are trees of dicts, lists, tuples and scalars;
+    anything else falls back to ``deepcopy`` for that subtree.
+    """
+
+    value_type = type(value)
+    if value_type is dict:
+        return {key: _fast_clone(item) for key, item in value.items()}
+    if value_type is list:
+        return [_fast_clone(item) for item in value]
+    if value_type is tuple:
+        return tuple(_fast_clone(item) for item in value)
+    if value_type in _ATOMIC_TYPES:
+        return value
+    return deepcopy(value)
+
+
 class ConversationStore:
     """In-memory registry of conversation state per session."""
 
     def __init__(self) -> None:
         self._sessions: Dict[str, ConversationState] = {}
+        self._lock = threading.Lock()
 
     def get(self, session_id: str) -> ConversationState:
-        if session_id not in self._sessions:
-            self._sessions[session_id] = ConversationState(session_id=session_id)
-        return self._sessions[session_id]
+        state = self._sessions.get(session_id)
+        if state is None:
+            # setdefault under the lock so concurrent first requests for a
+            # session share one state object.
+            with self._lock:
+                state = self._sessions.setdefault(
+                    session_id, ConversationState(session_id=session_id)
+                )
+        return state
 
 
     def peek(self, session_id: str) -> Optional[ConversationState]:
         return self._sessions.get(session_id)
 
 
-    def update_last(self, session_id: str, nql: Dict[str, Any], plan: Dict[str, Any]) -> None:
+    def update_last(
+        self,
+        session_id: str,
+        nql: Union[NQLQuery, Dict[str, Any]],
+        plan: Dict[str, Any],
+        *,
+        copy: bool = True,
+    ) -> None:
+        """Record the last runnable query of a session.
+
+        A compiled ``NQLQuery`` is dumped once, which already yields fresh
+        containers.  Callers that hand over payloads they will not touch again
+        can pass ``copy=False`` to store them as-is; the stored state is never
+        mutated in place (``rewrite_followup`` parses a fresh model from it).
+        """
+
         state = self.get(session_id)
-        state.last_nql = deepcopy(nql)
-        state.last_plan = deepcopy(plan)
-        state.pending = None
+        if isinstance(nql, NQLQuery):
+            last_nql = _dump_nql(nql)
+        else:
+            last_nql = _fast_clone(nql) if copy else nql
+        last_plan = _fast_clone(plan) if copy else plan
+        with self._lock:
+            state.last_nql = last_nql
+            state.last_plan = last_plan
+            state.pending = None
 
     def set_pending(
         self,
@@ -516,12 +784,19 @@ class ConversationStore:
             suggested_answers=suggested_answers,
             context=context or {},
         )
-        state.pending = pending
+        with self._lock:
+            state.pending = pending
         return pending
 
     def clear_pending(self, session_id: str) -> None:
         state = self.get(session_id)
-        state.pending = None
+        with self._lock:
+            state.pending = None
+
+
+@lru_cache(maxsize=256)
+def _icase_escape_pattern(text: str) -> Pattern[str]:
+    return re.compile(re.escape(text), re.IGNORECASE)
 
 
 def apply_clarification_answer(
@@ -544,7 +819,7 @@ def apply_clarification_answer(
         candidate = pending.context.get("dimension_candidate")
         merged = pending.utterance
         if candidate:
-            pattern = re.compile(re.escape(candidate), re.IGNORECASE)
+            pattern = _icase_escape_pattern(candidate)
             merged = pattern.sub(canonical, merged, count=1)
         else:
             merged = f"{merged} by {canonical}"
@@ -558,6 +833,7 @@ __all__ = [
     "ConversationStore",
     "PendingClarification",
     "ClarifierResult",
+    "analyze_followup",
     "assess_ambiguity",
     "apply_clarification_answer",
     "rewrite_followup",
@@ -627,17 +903,26 @@ _SUBJECT_VALUE_KEYWORDS = {
     "burglaries": ("crime_type", "Burglary"),
 }
 
+_ANAPHORA_SCAN_KEYWORDS = _substring_keywords(_ANAPHORA_TOKENS)
+_METRIC_SCAN_KEYWORDS = _substring_keywords(_METRIC_KEYWORDS)
+
+# One alternation scans the utterance once instead of a search per keyword.
+# Longer keywords go first so "robberies" is never cut short at "robber...".
+_SUBJECT_KEYWORD_PATTERN = re.compile(
+    r"\b("
+    + "|".join(re.escape(keyword) for keyword in sorted(_SUBJECT_VALUE_KEYWORDS, key=len, reverse=True))
+    + r")\b"
+)
+
 
 def _looks_like_question(text: str) -> bool:
     stripped = text.strip().lower()
-    if not stripped:
-        return False
-    if stripped.endswith("?"):
-        return True
-    return any(stripped.startswith(prefix) for prefix in _QUESTION_STARTERS)
+    return stripped.endswith("?") or stripped.startswith(_QUESTION_STARTERS)
 
 
 def _starts_with_count_phrase(text: str) -> Optional[str]:
+    if not text.startswith(_COUNT_PREFIXES):
+        return None
     for phrase in _COUNT_PREFIXES:
         if text.startswith(phrase):
             return phrase
@@ -648,44 +933,59 @@ def _classify_topic_shift(
     conversation_state: Dict[str, Any],
     utterance: str,
     *,
+    lowered: Optional[str] = None,
     force_fresh: bool = False,
 ) -> Dict[str, Any]:
-    lowered = utterance.strip().lower()
-    reasons: List[str] = []
-
     if force_fresh:
         return {"is_fresh_query": True, "reasons": ["forced_context_off"]}
 
+    if lowered is None:
+        lowered = utterance.lower()
+    reasons = _topic_shift_reasons(lowered.strip())
+    return {"is_fresh_query": bool(reasons), "reasons": list(reasons)}
+
+
+# The verdict depends only on the utterance text, so clarifier retries and
+# repeated prompts skip the keyword and regex scans entirely.
+@lru_cache(maxsize=2048)
+def _topic_shift_reasons(lowered: str) -> Tuple[str, ...]:
     if not lowered:
-        return {"is_fresh_query": False, "reasons": []}
+        return ()
 
+    reasons: List[str] = []
     count_prefix = _starts_with_count_phrase(lowered)
     if count_prefix:
         reasons.append(f"starts_with_{count_prefix.replace(' ', '_')}")
 
     looks_like_question = _looks_like_question(lowered)
-    contains_anaphora = any(token in lowered for token in _ANAPHORA_TOKENS)
-    has_metric_keyword = any(keyword in lowered for keyword in _METRIC_KEYWORDS)
+    contains_anaphora = any(token in lowered for token in _ANAPHORA_SCAN_KEYWORDS)
+    has_metric_keyword = any(keyword in lowered for keyword in _METRIC_SCAN_KEYWORDS)
     if looks_like_question and not contains_anaphora and has_metric_keyword:
         reasons.append("question_no_anaphora")
 
     if looks_like_question and " by " not in lowered:
-        if re.search(r"\b(?:in|for|at|within|across)\s+[a-z]", lowered):
+        if _NEW_ENTITY_PREPOSITION_PATTERN.search(lowered):
             reasons.append("new_entity_preposition")
 
-    return {"is_fresh_query": bool(reasons), "reasons": reasons}
+    return tuple(reasons)
 
 
 def _infer_subject_filters(
     utterance: str,
     existing_fields: List[str],
+    *,
+    lowered: Optional[str] = None,
 ) -> List[Filter]:
-    lowered = utterance.lower()
+    if lowered is None:
+        lowered = utterance.lower()
     filters: List[Filter] = []
     seen_fields = set(existing_fields)
 
+    matched = {match.group(1) for match in _SUBJECT_KEYWORD_PATTERN.finditer(lowered)}
+    # Walk the table rather than the matches so the first keyword listed for
+    # a field still wins, whatever order the utterance mentions them in.
     for keyword, (field, value) in _SUBJECT_VALUE_KEYWORDS.items():
-        if re.search(rf"\b{re.escape(keyword)}\b", lowered) and field not in seen_fields:
+        if keyword in matched and field not in seen_fields:
             filters.append(
                 Filter(
                     field=field,
@@ -741,7 +1041,7 @@ def _reset_time_for_fresh_query(
     if not anchor_end and today:
         anchor_end = date(today.year, today.month, 1).isoformat()
 
-    _set_relative_months_window(nql, 12, anchor_end)
+    _set_relative_months_window(nql, 12, anchor_end, today=today)
 
 
 def _build_filters_from_plan(plan_filters: List[Dict[str, Any]]) -> List[Filter]:
@@ -750,6 +1050,8 @@ def _build_filters_from_plan(plan_filters: List[Dict[str, Any]]) -> List[Filter]
         field = entry.get("field")
         if not field or field == "month":
             continue
+        if isinstance(field, str):
+            field = sys.intern(field)
         op = entry.get("op", "=")
         value = entry.get("value")
         if field == "weapon" and op in {"like", "ilike", "like_any"}:
@@ -775,10 +1077,13 @@ def _build_fresh_query(
     conversation_state: Dict[str, Any],
     utterance: str,
     *,
+    lowered: Optional[str] = None,
     today: Optional[date],
     reasons: List[str],
 ) -> NQLQuery:
-    base = NQLQuery.parse_obj(deepcopy(conversation_state))
+    if lowered is None:
+        lowered = utterance.lower()
+    base = _parse_nql(conversation_state)
     base.intent = "aggregate"
     base.dimensions = []
     base.group_by = []
@@ -794,11 +1099,9 @@ def _build_fresh_query(
     if includes_grouping:
         base.group_by = [dim for dim in group_by if dim != "month"]
 
-    count_prefix = _starts_with_count_phrase(utterance.lower().strip())
+    count_prefix = _starts_with_count_phrase(lowered.strip())
     if count_prefix:
         base.metrics = [Metric(name="incident_count", agg="count", alias="count")]
-    else:
-        base.metrics = [metric.copy(deep=True) for metric in base.metrics]
 
     _reset_time_for_fresh_query(
         base,
@@ -809,16 +1112,19 @@ def _build_fresh_query(
 
     filters_from_plan = _build_filters_from_plan(plan.get("filters", []))
     existing_fields = [f.field for f in filters_from_plan]
-    subject_filters = _infer_subject_filters(utterance, existing_fields)
+    subject_filters = _infer_subject_filters(utterance, existing_fields, lowered=lowered)
     base.filters.extend(filters_from_plan)
+    filtered_fields = {f.field for f in base.filters if f.field != "month"}
     for filt in subject_filters:
-        if filt.field not in {f.field for f in base.filters if f.field != "month"}:
+        if filt.field not in filtered_fields:
             base.filters.append(filt)
+            if filt.field != "month":
+                filtered_fields.add(filt.field)
 
     base.provenance.retrieval_notes = []
     reason_slug = "+".join(reasons) if reasons else "manual"
     note = f"topic_shift:{reason_slug}"
-    if count_prefix and " by " not in utterance.lower():
+    if count_prefix and " by " not in lowered:
         note = f"{note} -> reset dims/group_by"
     base.provenance.retrieval_notes.append(note)
 
@@ -19,8 +19,10 @@ class ErrorType(str, Enum):
     def has_value(cls, value: str) -> bool:
         """Return True if *value* matches one of the enum members."""
 
-        try:
-            cls(value)
-        except ValueError:
-            return False
-        return True
+        # Members hash by name, not value, so they cannot be probed in the set.
+        if isinstance(value, cls):
+            return True
+        return isinstance(value, str) and value in _ERROR_VALUES
+
+
+_ERROR_VALUES = frozenset(member.value for member in ErrorType)
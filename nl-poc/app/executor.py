@@ -1,14 +1,27 @@
 """DuckDB execution utilities."""
 from __future__ import annotations
 
+import heapq
+import os
 import time
 from dataclasses import dataclass
 from datetime import date, datetime
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import duckdb
 
+try:  # pragma: no cover - optional dependency
+    from rapidfuzz import process as _rapid_process
+    from rapidfuzz.distance import Levenshtein as _RapidLevenshtein
+except ModuleNotFoundError:  # pragma: no cover
+    _rapid_process = None
+    _RapidLevenshtein = None
+
+
+# (values, lower-cased values, lower-cased value -> first original spelling)
+_DistinctValues = Tuple[List[object], List[Optional[str]], Dict[str, str]]
+
 
 @dataclass
 class QueryResult:
@@ -19,10 +32,26 @@ class QueryResult:
 
 
 class DuckDBExecutor:
-    def __init__(self, db_path: Path):
+    def __init__(
+        self,
+        db_path: Path,
+        *,
+        threads: Optional[int] = None,
+        memory_limit: Optional[str] = None,
+    ):
         self.db_path = db_path
         self._conn = duckdb.connect(str(db_path))
-        self._conn.execute("PRAGMA threads=4")
+        # Default to one DuckDB worker per CPU rather than a fixed four.
+        threads = max(1, threads or os.cpu_count() or 4)
+        self._conn.execute(f"PRAGMA threads={threads}")
+        self._conn.execute("PRAGMA enable_object_cache=true")
+        if memory_limit:
+            escaped = memory_limit.replace("'", "''")
+            self._conn.execute(f"PRAGMA memory_limit='{escaped}'")
+        # DISTINCT values per dimension expression, with a parallel list of
+        # lower-cased strings (``None`` for non-string values) and a map from
+        # each lower-cased string to its first original spelling.
+        self._distinct_cache: Dict[str, _DistinctValues] = {}
 
     @property
     def connection(self) -> duckdb.DuckDBPyConnection:
@@ -37,17 +66,19 @@ class DuckDBExecutor:
         If result set exceeds max_rows, sets truncated=True.
         """
         start = time.perf_counter()
-        result = self._conn.execute(sql)
-        columns = [desc[0] for desc in result.description]
-
-        # Stream rows up to the limit
-        records: List[Dict[str, object]] = []
-        truncated = False
-        for idx, row in enumerate(result.fetchall()):
-            if idx >= max_rows:
-                truncated = True
-                break
-            records.append(dict(zip(columns, row)))
+        # A DuckDB connection is not thread-safe, and tools may run queries
+        # concurrently, so every call gets its own cursor.
+        with self._conn.cursor() as cursor:
+            result = cursor.execute(sql)
+            columns = [desc[0] for desc in result.description]
+
+            # Fetch one row past the limit: enough to detect truncation without
+            # materialising the rest of the result set.
+            rows = result.fetchmany(max_rows + 1)
+        truncated = len(rows) > max_rows
+        if truncated:
+            del rows[max_rows:]
+        records: List[Dict[str, object]] = [dict(zip(columns, row)) for row in rows]
 
         runtime_ms = (time.perf_counter() - start) * 1000
         return QueryResult(
@@ -60,33 +91,82 @@ class DuckDBExecutor:
     def find_closest_value(self, dimension, value: str) -> Optional[str]:
         if not value:
             return None
-        sql = f"SELECT DISTINCT {self._dimension_sql(dimension)} AS val FROM la_crime_raw"
         try:
-            vals = [row[0] for row in self._conn.execute(sql).fetchall() if row[0] is not None]
+            vals, lowered, exact = self._distinct_values(dimension)
         except duckdb.Error:
             return None
         norm = value.lower()
-        for item in vals:
-            if isinstance(item, str) and item.lower() == norm:
-                return item
+        hit = exact.get(norm)
+        if hit is not None:
+            return hit
         # try startswith match
-        for item in vals:
-            if isinstance(item, str) and item.lower().startswith(norm):
-                return item
-        return None
+        return next(
+            (
+                item
+                for item, item_lower in zip(vals, lowered)
+                if item_lower is not None and item_lower.startswith(norm)
+            ),
+            None,
+        )
 
     def closest_matches(self, dimension, value: str, limit: int = 5) -> List[str]:
-        sql = f"SELECT DISTINCT {self._dimension_sql(dimension)} AS val FROM la_crime_raw"
-        vals = [row[0] for row in self._conn.execute(sql).fetchall() if row[0] is not None]
-        scored = []
+        vals, lowered_vals, _ = self._distinct_values(dimension)
+        if limit <= 0:
+            return []
         target = value.lower()
-        for item in vals:
-            if not isinstance(item, str):
+        if _rapid_process is not None:
+            # rapidfuzz skips the ``None`` placeholders, keeps the ``limit``
+            # best in C and breaks ties on index, matching the heap below.
+            matches = _rapid_process.extract(
+                target, lowered_vals, scorer=_RapidLevenshtein.distance, limit=limit
+            )
+            return [vals[index] for _, _, index in matches]
+        target_len = len(target)
+        # Bounded max-heap of the best ``limit`` matches so far, keyed on
+        # (-distance, -position) so the root is the current worst and ties
+        # keep first-seen order.
+        best: List[Tuple[int, int, str]] = []
+        for position, (item, lowered) in enumerate(zip(vals, lowered_vals)):
+            if lowered is None:
                 continue
-            score = _levenshtein(target, item.lower())
-            scored.append((score, item))
-        scored.sort(key=lambda x: x[0])
-        return [item for _, item in scored[:limit]]
+            # Edit distance is at least the length difference, so a value
+            # that cannot beat the current worst is skipped without the DP.
+            if len(best) == limit:
+                worst = -best[0][0]
+                if abs(len(lowered) - target_len) >= worst:
+                    continue
+                # Only distances below the current worst matter; anything
+                # above the cutoff comes back as ``cutoff + 1``.
+                distance = _edit_distance(target, lowered, worst - 1)
+            else:
+                distance = _edit_distance(target, lowered, None)
+            entry = (-distance, -position, item)
+            if len(best) < limit:
+                heapq.heappush(best, entry)
+            elif entry > best[0]:
+                heapq.heapreplace(best, entry)
+        return [item for _, _, item in sorted(best, reverse=True)]
+
+    def invalidate_distinct_cache(self) -> None:
+        """Forget cached DISTINCT values (call after the underlying data is reloaded)."""
+
+        self._distinct_cache.clear()
+
+    def _distinct_values(self, dimension) -> _DistinctValues:
+        key = self._dimension_sql(dimension)
+        cached = self._distinct_cache.get(key)
+        if cached is None:
+            sql = f"SELECT DISTINCT {key} AS val FROM la_crime_raw"
+            with self._conn.cursor() as cursor:
+                rows = cursor.execute(sql).fetchall()
+            vals = [row[0] for row in rows if row[0] is not None]
+            lowered = [item.lower() if isinstance(item, str) else None for item in vals]
+            exact: Dict[str, str] = {}
+            for item, item_lower in zip(vals, lowered):
+                if item_lower is not None:
+                    exact.setdefault(item_lower, item)
+            cached = self._distinct_cache[key] = (vals, lowered, exact)
+        return cached
 
     def _dimension_sql(self, dimension) -> str:
         column = dimension.column
@@ -98,7 +178,9 @@ class DuckDBExecutor:
         self._conn.close()
 
 
-def _levenshtein(a: str, b: str) -> int:
+def _levenshtein(a: str, b: str, score_cutoff: Optional[int] = None) -> int:
+    """Return the edit distance of *a* and *b*, or ``score_cutoff + 1`` once it is exceeded."""
+
     if len(a) < len(b):
         a, b = b, a
     previous = list(range(len(b) + 1))
@@ -110,4 +192,63 @@ def _levenshtein(a: str, b: str) -> int:
             replace_cost = previous[j - 1] + (ca != cb)
             current.append(min(insert_cost, delete_cost, replace_cost))
         previous = current
-    return previous[-1]
+        # Row minima never decrease, so the distance is already out of reach.
+        if score_cutoff is not None and min(previous) > score_cutoff:
+            return score_cutoff + 1
+    distance = previous[-1]
+    if score_cutoff is not None and distance > score_cutoff:
+        return score_cutoff + 1
+    return distance
+
+
+def _myers_distance(a: str, b: str, score_cutoff: Optional[int] = None) -> int:
+    """Bit-parallel (Myers/Hyyrö) edit distance for ``len(b) <= 64``.
+
+    Each column of the DP matrix is held as vertical +1/-1 delta bitmasks,
+    so one pass over *a* replaces the nested loop of ``_levenshtein``.
+    Cutoff semantics match ``_levenshtein``.
+    """
+
+    length = len(b)
+    if not length:
+        distance = len(a)
+    else:
+        peq: Dict[str, int] = {}
+        for index, ch in enumerate(b):
+            peq[ch] = peq.get(ch, 0) | (1 << index)
+        mask = (1 << length) - 1
+        last = 1 << (length - 1)
+        vp, vn = mask, 0
+        distance = length
+        remaining = len(a)
+        for ch in a:
+            eq = peq.get(ch, 0)
+            xv = eq | vn
+            xh = (((eq & vp) + vp) ^ vp) | eq
+            hp = vn | (~(xh | vp) & mask)
+            hn = vp & xh
+            if hp & last:
+                distance += 1
+            elif hn & last:
+                distance -= 1
+            remaining -= 1
+            # Each remaining character lowers the distance by at most one.
+            if score_cutoff is not None and distance - remaining > score_cutoff:
+                return score_cutoff + 1
+            hp = ((hp << 1) | 1) & mask
+            hn = (hn << 1) & mask
+            vp = hn | (~(xv | hp) & mask)
+            vn = hp & xv
+    if score_cutoff is not None and distance > score_cutoff:
+        return score_cutoff + 1
+    return distance
+
+
+def _edit_distance(a: str, b: str, score_cutoff: Optional[int]) -> int:
+    if _RapidLevenshtein is not None:
+        return _RapidLevenshtein.distance(a, b, score_cutoff=score_cutoff)
+    if len(a) < len(b):
+        a, b = b, a
+    if len(b) <= 64:
+        return _myers_distance(a, b, score_cutoff)
+    return _levenshtein(a, b, score_cutoff)
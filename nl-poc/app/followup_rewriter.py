@@ -45,6 +45,17 @@ _METRIC_PATTERNS: Iterable[re.Pattern[str]] = (
     ),
 )
 
+# Literal lead-in of each ``_METRIC_PATTERNS`` entry.  A pattern whose
+# lead-in is absent cannot match, so its search is skipped.
+_METRIC_LEAD_INS = ("how many", "number of", "count of", "show", "give me")
+
+# Where each metric pattern's phrase group can start, and the run of
+# characters that group may span.  See ``_search_metric``.
+_METRIC_STARTS = tuple(
+    re.compile(rf"\b{lead_in}\s+(?=[a-z])", re.I) for lead_in in _METRIC_LEAD_INS
+)
+_METRIC_PHRASE_RUN = re.compile(r"[a-z0-9\s_-]*", re.I)
+
 _METRIC_STOPWORDS = {
     "happened",
     "occurred",
@@ -69,6 +80,8 @@ _TIME_PATTERNS: Iterable[tuple[re.Pattern[str], str]] = (
     (re.compile(r"\bthis month\b", re.I), "this_month"),
 )
 
+_TIME_LEAD_INS = ("last year", "this year", "last month", "this month")
+
 _TIME_RANGE_PATTERNS: Iterable[tuple[re.Pattern[str], str]] = (
     (
         re.compile(r"\blast\s+(\d{1,2})\s+(day|week|month|year)s?\b", re.I),
@@ -96,6 +109,8 @@ _FILTER_PATTERNS: Iterable[re.Pattern[str]] = (
     re.compile(r"\bin\s+([a-z][\w\s'&/-]+)", re.I),
 )
 
+_FILTER_LEAD_INS = ("only", "just", "filter", "in")
+
 _FILTER_STOPWORDS = {
     "please",
     "thanks",
@@ -120,9 +135,12 @@ _TIME_WORDS = {
     "after",
 }
 
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+_STRIP_CHARS = ".,!? "
+
 
 def _clean_identifier(text: str) -> Optional[str]:
-    cleaned = re.sub(r"[^a-z0-9]+", " ", text.lower()).strip()
+    cleaned = _NON_ALNUM_RE.sub(" ", text.lower()).strip()
     if not cleaned:
         return None
     return cleaned.replace(" ", "_")
@@ -140,9 +158,44 @@ def _normalise_group_by(value) -> Optional[str]:
     return None
 
 
-def _extract_metric(utterance: str) -> Optional[str]:
-    for pattern in _METRIC_PATTERNS:
-        match = pattern.search(utterance)
+def _may_match(lead_in: str, lowered: str) -> bool:
+    # ``re.I`` also folds a few non-ASCII characters (e.g. the long s) onto
+    # ASCII letters, so the substring shortcut only applies to ASCII text.
+    return lead_in in lowered or not lowered.isascii()
+
+
+def _search_metric(
+    pattern: re.Pattern[str], start_pattern: re.Pattern[str], utterance: str
+) -> Optional[re.Match[str]]:
+    """Return ``pattern.search(utterance)`` without its quadratic worst case.
+
+    A plain search retries the lazy phrase group from every lead-in, so an
+    utterance repeating "how many" without a terminator takes quadratic time.
+    When the pattern fails at one lead-in, no terminator follows anywhere in
+    that phrase run, so every later lead-in inside the run fails as well and
+    the scan resumes after it.
+    """
+
+    pos = 0
+    while True:
+        start = start_pattern.search(utterance, pos)
+        if start is None:
+            return None
+        match = pattern.match(utterance, start.start())
+        if match:
+            return match
+        pos = _METRIC_PHRASE_RUN.match(utterance, start.end()).end()
+
+
+def _extract_metric(utterance: str, *, lowered: Optional[str] = None) -> Optional[str]:
+    if lowered is None:
+        lowered = utterance.lower()
+    for lead_in, start_pattern, pattern in zip(
+        _METRIC_LEAD_INS, _METRIC_STARTS, _METRIC_PATTERNS
+    ):
+        if not _may_match(lead_in, lowered):
+            continue
+        match = _search_metric(pattern, start_pattern, utterance)
         if not match:
             continue
         candidate = match.group(1).strip()
@@ -158,8 +211,8 @@ def _extract_metric(utterance: str) -> Optional[str]:
 
 
 def _extract_time(lowered: str) -> Optional[str]:
-    for pattern, value in _TIME_PATTERNS:
-        if pattern.search(lowered):
+    for lead_in, (pattern, value) in zip(_TIME_LEAD_INS, _TIME_PATTERNS):
+        if _may_match(lead_in, lowered) and pattern.search(lowered):
             return value
 
     for pattern, template in _TIME_RANGE_PATTERNS:
@@ -199,7 +252,7 @@ def _extract_replace_dimension(lowered: str) -> Optional[str]:
 
 
 def _clean_filter_value(raw: str) -> Optional[str]:
-    value = raw.strip().strip(".,!? ")
+    value = raw.strip().strip(_STRIP_CHARS)
     if not value:
         return None
     words = value.split()
@@ -220,10 +273,14 @@ def _extract_filters(
     utterance: str,
     *,
     field: str,
+    lowered: Optional[str] = None,
 ) -> List[str]:
     filters: List[str] = []
-    lowered = utterance.lower()
-    for pattern in _FILTER_PATTERNS:
+    if lowered is None:
+        lowered = utterance.lower()
+    for lead_in, pattern in zip(_FILTER_LEAD_INS, _FILTER_PATTERNS):
+        if not _may_match(lead_in, lowered):
+            continue
         match = pattern.search(lowered)
         if not match:
             continue
@@ -236,17 +293,6 @@ def _extract_filters(
     return filters
 
 
-def _deduplicate(items: Iterable[str]) -> List[str]:
-    seen = set()
-    result: List[str] = []
-    for item in items:
-        if item in seen:
-            continue
-        seen.add(item)
-        result.append(item)
-    return result
-
-
 def _determine_filter_field(
     previous_group_by: Optional[str],
     candidate_group_by: Optional[str],
@@ -282,13 +328,13 @@ def rewrite_followup_state(
     previous_group = _normalise_group_by(last_state.get("group_by"))
     previous_filters = list(last_state.get("filters", []))
 
-    metric_candidate = _extract_metric(utterance)
+    metric_candidate = _extract_metric(utterance, lowered=lowered)
     time_candidate = _extract_time(lowered)
     replace_dimension = _extract_replace_dimension(lowered)
     group_by_candidate = _extract_group_by(lowered)
 
     filter_field = _determine_filter_field(previous_group, group_by_candidate)
-    filter_candidates = _extract_filters(utterance, field=filter_field)
+    filter_candidates = _extract_filters(utterance, field=filter_field, lowered=lowered)
 
     action: Action
 
@@ -318,7 +364,7 @@ def rewrite_followup_state(
         group_by_value = replace_dimension
         filters = previous_filters
         if filter_candidates:
-            filters = _deduplicate([*filters, *filter_candidates])
+            filters = list(dict.fromkeys([*filters, *filter_candidates]))
         return {
             "action": "replace_dimension",
             "metric": metric,
@@ -331,7 +377,7 @@ def rewrite_followup_state(
         metric = metric_candidate or previous_metric or ""
         time_value = time_candidate or previous_time or "all_time"
         group_by_value = previous_group
-        filters = _deduplicate([*previous_filters, *filter_candidates])
+        filters = list(dict.fromkeys([*previous_filters, *filter_candidates]))
         return {
             "action": "add_filter",
             "metric": metric,
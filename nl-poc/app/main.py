@@ -21,9 +21,8 @@ from .canonical import CanonicalStore, CanonicalWatcher
 from .http.feedback import router as feedback_router
 from .conversation import (
     ConversationStore,
-    assess_ambiguity,
+    analyze_followup,
     apply_clarification_answer,
-    rewrite_followup,
     _is_self_contained_query,
 )
 from .executor import DuckDBExecutor
@@ -555,8 +554,16 @@ def chat_complete(
     is_followup = session.last_nql and not _is_self_contained_query(utterance)
 
     if gate_status is None and is_followup:
-        if context_enabled:
-            clarification = assess_ambiguity(session.last_nql, utterance)
+        try:
+            # Without context the clarifier is skipped and the rewrite starts fresh.
+            clarification, merged_nql = analyze_followup(
+                session.last_nql,
+                utterance,
+                force_fresh=not context_enabled,
+            )
+        except ValueError as exc:
+            nql_failure_status = _build_nql_failure("generator", exc)
+        else:
             if clarification.needs_clarification:
                 pending = _conversations.set_pending(
                     session_id,
@@ -579,15 +586,6 @@ def chat_complete(
                 }
                 return response_data
 
-        try:
-            merged_nql = rewrite_followup(
-                session.last_nql,
-                utterance,
-                force_fresh=not context_enabled,
-            )
-        except ValueError as exc:
-            nql_failure_status = _build_nql_failure("generator", exc)
-        else:
             try:
                 compiled = compile_payload(merged_nql)
             except NQLValidationError as exc:
@@ -598,7 +596,7 @@ def chat_complete(
                 response = _execute_query(compiled.plan, utterance, intent_engine="nql")
                 response["engine"] = "nql"
                 response["nql_status"] = {"attempted": True, "valid": True}
-                _conversations.update_last(session_id, compiled.nql.dict(), response["plan"])
+                _conversations.update_last(session_id, compiled.nql, response["plan"], copy=False)
                 return _build_conversation_response(response)
 
     plan = build_plan(utterance, prefer_llm=prefer_llm)
@@ -613,7 +611,7 @@ def chat_complete(
         session.last_plan = response["plan"]
     elif nql_payload and execution_engine == "nql":
         response["nql_status"] = planner_status or {"attempted": True, "valid": True}
-        _conversations.update_last(session_id, nql_payload, response["plan"])
+        _conversations.update_last(session_id, nql_payload, response["plan"], copy=False)
     else:
         status = nql_failure_status or planner_status or {"attempted": False}
         response["nql_status"] = status
@@ -658,7 +656,7 @@ def chat_clarify(
     response = _execute_query(compiled.plan, utterance, intent_engine="nql")
     response["engine"] = "nql"
     response["nql_status"] = {"attempted": True, "valid": True}
-    _conversations.update_last(session_id, compiled.nql.dict(), response["plan"])
+    _conversations.update_last(session_id, compiled.nql, response["plan"], copy=False)
     return _build_conversation_response(response)
 
 
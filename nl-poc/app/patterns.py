@@ -3,9 +3,14 @@
 This module contains regex patterns and parsing functions for detecting
 user intent in follow-up queries, including filter modifications, dimension
 changes, and time adjustments.
+
+Each ``match_*`` function accepts an optional ``lowered`` copy of the
+utterance so callers running several matchers lowercase it only once.
 """
 
 import re
+import sys
+from functools import lru_cache
 from typing import Optional, Tuple, List
 from dataclasses import dataclass
 
@@ -39,12 +44,56 @@ class TopN:
     dimension: Optional[str] = None  # Specific dimension if mentioned
 
 
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+_FOR_PATTERN = re.compile(r"\bfor\b")
+# "same but by X" anywhere wins over the leftmost plain "by X"; the
+# anchored lookahead checks for it once before the scan for "by" begins.
+# "break down by X" and "group by X" always contain a plain "by X" match.
+_DIMENSION_CHANGE_PATTERN = re.compile(
+    r"^(?=.*?same(?:\s+view)?\s+but\s+by\s+(?P<same>[a-z\s]+))|by\s+(?P<by>[a-z\s]+)",
+    re.DOTALL,
+)
+_FILTER_REMOVAL_PATTERN = re.compile(
+    r"(?:filter out|exclude|remove|drop)\s+([\w\s'&/-]+(?:\s+and\s+[\w\s'&/-]+)*)"
+)
+_MULTI_VALUE_SEPARATOR_PATTERN = re.compile(r'\s+and\s+|,\s*')
+_INCLUDE_PATTERN = re.compile(r"(?:include)\s+([\w\s'&/-]+(?:\s+and\s+[\w\s'&/-]+)*)")
+_REPLACE_PATTERN = re.compile(
+    r"(?:only|just|now\s+look\s+at|look\s+at|consider|focus\s+on|show\s+me|switch\s+to|change\s+to|swap\s+to)\s+([\w\s'&/-]+(?:\s+and\s+[\w\s'&/-]+)*)"
+)
+_RESET_FILTERS_PATTERN = re.compile(r"(?:reset|clear)\s+(?:all\s+)?filters?")
+_REMOVE_ALL_FILTERS_PATTERN = re.compile(r"(?:remove|drop)\s+all\s+filters?")
+_CLEAR_FIELD_PATTERNS = (
+    (re.compile(r"(?:show\s+)?all\s+areas?"), "area"),
+    (re.compile(r"(?:show\s+)?all\s+weapons?"), "weapon"),
+    (re.compile(r"(?:show\s+)?all\s+crimes?"), "crime_type"),
+    (re.compile(r"(?:show\s+)?all\s+(?:crime\s+)?types?"), "crime_type"),
+    (re.compile(r"(?:show\s+)?all\s+premises?"), "premise"),
+    (re.compile(r"(?:show\s+)?everything"), ""),
+)
+_BETWEEN_PATTERN = re.compile(r"(?:between|from)\s+(\d+)\s+(?:and|to)\s+(\d+)")
+_GT_PATTERN = re.compile(r"(?:over|above|more than|greater than)\s+(\d+)")
+_GTE_PATTERN = re.compile(r"(?:at least|(\d+)\s+or more)\s+(\d+)")
+_LT_PATTERN = re.compile(r"(?:under|below|less than|fewer than)\s+(\d+)")
+_LTE_PATTERN = re.compile(r"(?:at most|(\d+)\s+or less)\s+(\d+)")
+_TOP_PATTERN = re.compile(r"(?:top|highest|best)\s+(\d+)\s*([a-z]+)?")
+_BOTTOM_PATTERN = re.compile(r"(?:bottom|lowest|worst)\s+(\d+)\s*([a-z]+)?")
+_MOM_ON_PATTERN = re.compile(r"(turn on|add|include).*(mom|month over month)")
+_MOM_WORD_PATTERN = re.compile(r"\bmom\b")
+_MOM_OFF_PATTERN = re.compile(r"(turn off|remove|drop).*(mom|month over month)")
+
+
+@lru_cache(maxsize=4096)
 def normalize_text(value: str) -> str:
-    """Normalize text by collapsing whitespace and lowercasing."""
-    return re.sub(r"\s+", " ", value.strip().lower())
+    """Normalize text by collapsing whitespace and lowercasing.
+
+    Results are memoised and interned: filter removal normalises every
+    filter value on each rewrite, and the same values recur all session.
+    """
+    return sys.intern(_WHITESPACE_PATTERN.sub(" ", value.strip().lower()))
 
 
-def match_dimension_change(utterance: str) -> Optional[str]:
+def match_dimension_change(utterance: str, *, lowered: Optional[str] = None) -> Optional[str]:
     """
     Extract dimension change patterns like "by area", "same but by weapon".
 
@@ -59,26 +108,20 @@ def match_dimension_change(utterance: str) -> Optional[str]:
         >>> match_dimension_change("show total") is None
         True
     """
-    lowered = utterance.lower()
-    patterns = [
-        r"same(?:\s+view)?\s+but\s+by\s+([a-z\s]+)",
-        r"by\s+([a-z\s]+)",
-        r"break(?:ing|)\s+down\s+by\s+([a-z\s]+)",
-        r"group\s+by\s+([a-z\s]+)",
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, lowered)
-        if match:
-            candidate = match.group(1).strip()
-            # Remove common prepositions
-            candidate = re.sub(r"\bfor\b", "", candidate).strip()
-            return candidate
+    if lowered is None:
+        lowered = utterance.lower()
+
+    match = _DIMENSION_CHANGE_PATTERN.search(lowered)
+    if match:
+        candidate = (match.group("same") or match.group("by")).strip()
+        # Remove common prepositions
+        candidate = _FOR_PATTERN.sub("", candidate).strip()
+        return candidate
 
     return None
 
 
-def match_filter_removal(utterance: str) -> Optional[FilterRemoval]:
+def match_filter_removal(utterance: str, *, lowered: Optional[str] = None) -> Optional[FilterRemoval]:
     """
     Detect filter removal patterns like "drop Central", "remove Hollywood and Downtown".
 
@@ -90,18 +133,16 @@ def match_filter_removal(utterance: str) -> Optional[FilterRemoval]:
     Examples:
         >>> result = match_filter_removal("filter out Central")
         >>> result.values
-        ['Central']
+        ['central']
         >>> result = match_filter_removal("drop Hollywood and Downtown")
         >>> result.values
-        ['Hollywood', 'Downtown']
+        ['hollywood', 'downtown']
         >>> match_filter_removal("show me all") is None
         True
     """
-    lowered = utterance.lower()
-    match = re.search(
-        r"(?:filter out|exclude|remove|drop)\s+([\w\s'&/-]+(?:\s+and\s+[\w\s'&/-]+)*)",
-        lowered
-    )
+    if lowered is None:
+        lowered = utterance.lower()
+    match = _FILTER_REMOVAL_PATTERN.search(lowered)
 
     if match:
         value_str = match.group(1).strip().strip(". ")
@@ -115,6 +156,9 @@ def parse_multi_values(value_str: str) -> List[str]:
     """
     Parse multiple values separated by "and" or commas.
 
+    Values keep the caller's casing; the matchers below see lower-cased text
+    and callers map values onto their canonical spelling.
+
     Examples:
         >>> parse_multi_values("Central and Hollywood")
         ['Central', 'Hollywood']
@@ -122,12 +166,14 @@ def parse_multi_values(value_str: str) -> List[str]:
         ['Central', 'Hollywood', 'Downtown']
         >>> parse_multi_values("Hollywood")
         ['Hollywood']
+        >>> parse_multi_values("central and van nuys")
+        ['central', 'van nuys']
     """
-    values = re.split(r'\s+and\s+|,\s*', value_str)
-    return [v.strip().title() for v in values if v.strip()]
+    values = _MULTI_VALUE_SEPARATOR_PATTERN.split(value_str)
+    return [v.strip() for v in values if v.strip()]
 
 
-def match_filter_addition(utterance: str) -> Optional[FilterAddition]:
+def match_filter_addition(utterance: str, *, lowered: Optional[str] = None) -> Optional[FilterAddition]:
     """
     Detect filter addition patterns.
 
@@ -142,27 +188,25 @@ def match_filter_addition(utterance: str) -> Optional[FilterAddition]:
         >>> result.is_include
         True
         >>> result.values
-        ['Hollywood']
+        ['hollywood']
 
         >>> result = match_filter_addition("only Central and Hollywood")
         >>> result.is_include
         False
         >>> result.values
-        ['Central', 'Hollywood']
+        ['central', 'hollywood']
 
         >>> result = match_filter_addition("switch to Downtown")
         >>> result.is_include
         False
         >>> result.values
-        ['Downtown']
+        ['downtown']
     """
-    lowered = utterance.lower()
+    if lowered is None:
+        lowered = utterance.lower()
 
     # Try "include" pattern first (additive)
-    include_match = re.search(
-        r"(?:include)\s+([\w\s'&/-]+(?:\s+and\s+[\w\s'&/-]+)*)",
-        lowered
-    )
+    include_match = _INCLUDE_PATTERN.search(lowered)
 
     if include_match:
         value_str = include_match.group(1).strip().strip(". ")
@@ -170,10 +214,7 @@ def match_filter_addition(utterance: str) -> Optional[FilterAddition]:
         return FilterAddition(is_include=True, values=values)
 
     # Try "only/just/show me/switch/change" patterns (replace)
-    replace_match = re.search(
-        r"(?:only|just|now\s+look\s+at|look\s+at|consider|focus\s+on|show\s+me|switch\s+to|change\s+to|swap\s+to)\s+([\w\s'&/-]+(?:\s+and\s+[\w\s'&/-]+)*)",
-        lowered
-    )
+    replace_match = _REPLACE_PATTERN.search(lowered)
 
     if replace_match:
         value_str = replace_match.group(1).strip().strip(". ")
@@ -183,7 +224,7 @@ def match_filter_addition(utterance: str) -> Optional[FilterAddition]:
     return None
 
 
-def match_filter_clear(utterance: str) -> Optional[str]:
+def match_filter_clear(utterance: str, *, lowered: Optional[str] = None) -> Optional[str]:
     """
     Detect filter clear patterns like "reset filters", "show all areas".
 
@@ -200,33 +241,25 @@ def match_filter_clear(utterance: str) -> Optional[str]:
         >>> match_filter_clear("show me totals") is None
         True
     """
-    lowered = utterance.lower()
+    if lowered is None:
+        lowered = utterance.lower()
 
     # Check for generic clear all patterns
-    if re.search(r"(?:reset|clear)\s+(?:all\s+)?filters?", lowered):
+    if _RESET_FILTERS_PATTERN.search(lowered):
         return ""
 
-    if re.search(r"(?:remove|drop)\s+all\s+filters?", lowered):
+    if _REMOVE_ALL_FILTERS_PATTERN.search(lowered):
         return ""
 
     # Check for field-specific clear patterns
-    field_patterns = [
-        (r"(?:show\s+)?all\s+areas?", "area"),
-        (r"(?:show\s+)?all\s+weapons?", "weapon"),
-        (r"(?:show\s+)?all\s+crimes?", "crime_type"),
-        (r"(?:show\s+)?all\s+(?:crime\s+)?types?", "crime_type"),
-        (r"(?:show\s+)?all\s+premises?", "premise"),
-        (r"(?:show\s+)?everything", ""),
-    ]
-
-    for pattern, field in field_patterns:
-        if re.search(pattern, lowered):
+    for pattern, field in _CLEAR_FIELD_PATTERNS:
+        if pattern.search(lowered):
             return field
 
     return None
 
 
-def match_range_filter(utterance: str) -> Optional[RangeFilter]:
+def match_range_filter(utterance: str, *, lowered: Optional[str] = None) -> Optional[RangeFilter]:
     """
     Detect numeric range filter patterns like "over 100", "between 50 and 100".
 
@@ -243,35 +276,36 @@ def match_range_filter(utterance: str) -> Optional[RangeFilter]:
         >>> match_range_filter("show me totals") is None
         True
     """
-    lowered = utterance.lower()
+    if lowered is None:
+        lowered = utterance.lower()
 
     # Pattern for "between X and Y" or "from X to Y"
-    between_match = re.search(r"(?:between|from)\s+(\d+)\s+(?:and|to)\s+(\d+)", lowered)
+    between_match = _BETWEEN_PATTERN.search(lowered)
     if between_match:
         min_val = int(between_match.group(1))
         max_val = int(between_match.group(2))
         return RangeFilter(field="incidents", op="between", value=[min_val, max_val])
 
     # Pattern for "over X", "above X", "more than X", "greater than X"
-    gt_match = re.search(r"(?:over|above|more than|greater than)\s+(\d+)", lowered)
+    gt_match = _GT_PATTERN.search(lowered)
     if gt_match:
         value = int(gt_match.group(1))
         return RangeFilter(field="incidents", op=">", value=value)
 
     # Pattern for "at least X", "X or more"
-    gte_match = re.search(r"(?:at least|(\d+)\s+or more)\s+(\d+)", lowered)
+    gte_match = _GTE_PATTERN.search(lowered)
     if gte_match:
         value = int(gte_match.group(2) if gte_match.group(2) else gte_match.group(1))
         return RangeFilter(field="incidents", op=">=", value=value)
 
     # Pattern for "under X", "below X", "less than X", "fewer than X"
-    lt_match = re.search(r"(?:under|below|less than|fewer than)\s+(\d+)", lowered)
+    lt_match = _LT_PATTERN.search(lowered)
     if lt_match:
         value = int(lt_match.group(1))
         return RangeFilter(field="incidents", op="<", value=value)
 
     # Pattern for "at most X", "X or less"
-    lte_match = re.search(r"(?:at most|(\d+)\s+or less)\s+(\d+)", lowered)
+    lte_match = _LTE_PATTERN.search(lowered)
     if lte_match:
         value = int(lte_match.group(2) if lte_match.group(2) else lte_match.group(1))
         return RangeFilter(field="incidents", op="<=", value=value)
@@ -279,7 +313,7 @@ def match_range_filter(utterance: str) -> Optional[RangeFilter]:
     return None
 
 
-def match_top_n(utterance: str) -> Optional[TopN]:
+def match_top_n(utterance: str, *, lowered: Optional[str] = None) -> Optional[TopN]:
     """
     Detect top-N patterns like "top 5", "bottom 3 areas", "highest 10".
 
@@ -297,7 +331,8 @@ def match_top_n(utterance: str) -> Optional[TopN]:
         >>> result.k, result.direction, result.dimension
         (10, 'desc', 'weapon')
     """
-    lowered = utterance.lower()
+    if lowered is None:
+        lowered = utterance.lower()
 
     # Dimension mapping
     dimension_map = {
@@ -314,7 +349,7 @@ def match_top_n(utterance: str) -> Optional[TopN]:
     }
 
     # Top/highest/best patterns (descending)
-    top_match = re.search(r"(?:top|highest|best)\s+(\d+)\s*([a-z]+)?", lowered)
+    top_match = _TOP_PATTERN.search(lowered)
     if top_match:
         k = int(top_match.group(1))
         dimension_word = top_match.group(2)
@@ -322,7 +357,7 @@ def match_top_n(utterance: str) -> Optional[TopN]:
         return TopN(k=k, direction="desc", dimension=dimension)
 
     # Bottom/lowest/worst patterns (ascending)
-    bottom_match = re.search(r"(?:bottom|lowest|worst)\s+(\d+)\s*([a-z]+)?", lowered)
+    bottom_match = _BOTTOM_PATTERN.search(lowered)
     if bottom_match:
         k = int(bottom_match.group(1))
         dimension_word = bottom_match.group(2)
@@ -332,7 +367,7 @@ def match_top_n(utterance: str) -> Optional[TopN]:
     return None
 
 
-def match_mom_toggle(utterance: str) -> Optional[bool]:
+def match_mom_toggle(utterance: str, *, lowered: Optional[str] = None) -> Optional[bool]:
     """
     Detect month-over-month toggle patterns.
 
@@ -351,18 +386,19 @@ def match_mom_toggle(utterance: str) -> Optional[bool]:
         >>> match_mom_toggle("show me totals") is None
         True
     """
-    lowered = utterance.lower()
+    if lowered is None:
+        lowered = utterance.lower()
 
     # Enable patterns
-    if re.search(r"(turn on|add|include).*(mom|month over month)", lowered):
+    if _MOM_ON_PATTERN.search(lowered):
         return True
 
     # Check for standalone "mom" without "turn off"
-    if re.search(r"\bmom\b", lowered) and "turn off" not in lowered:
+    if _MOM_WORD_PATTERN.search(lowered) and "turn off" not in lowered:
         return True
 
     # Disable patterns
-    if re.search(r"(turn off|remove|drop).*(mom|month over month)", lowered):
+    if _MOM_OFF_PATTERN.search(lowered):
         return False
 
     return None
@@ -4,6 +4,7 @@ from __future__ import annotations
 import json
 import pathlib
 import re
+import threading
 from copy import deepcopy
 from dataclasses import dataclass
 from datetime import date
@@ -26,22 +27,29 @@ from .time_utils import TimeRange, extract_time_range, trailing_year_range
 PROMPT_PATH = pathlib.Path(__file__).parent / "llm_prompt_intent.txt"
 SEMANTIC_PATH = pathlib.Path(__file__).parents[1] / "config" / "semantic.yml"
 
-_LAST_ENGINE = "rule_based"
-_LAST_NQL_STATUS: Optional[Dict[str, object]] = None
+# Engine and NQL status of the most recent ``build_plan`` call, kept per
+# thread so concurrent callers (threadpool endpoints, parallel agent tool
+# calls) each read back the metadata of their own plan.
+_LAST = threading.local()
+
+
+def _last_nql_status() -> Optional[Dict[str, object]]:
+    return getattr(_LAST, "nql_status", None)
 
 
 def get_last_intent_engine() -> str:
-    """Return the planner engine used for the most recent plan."""
+    """Return the planner engine used for the most recent plan on this thread."""
 
-    return _LAST_ENGINE
+    return getattr(_LAST, "engine", "rule_based")
 
 
 def get_last_nql_status() -> Optional[Dict[str, object]]:
-    """Return metadata about the last NQL attempt."""
+    """Return metadata about the last NQL attempt on this thread."""
 
-    if _LAST_NQL_STATUS is None:
+    status = _last_nql_status()
+    if status is None:
         return None
-    return deepcopy(_LAST_NQL_STATUS)
+    return deepcopy(status)
 
 
 def _slug_reason(message: str) -> str:
@@ -447,17 +455,13 @@ def build_plan_rule_based(question: str) -> Dict[str, object]:
         aggregate=aggregate,
         extras=extras or None,
     )
-    global _LAST_ENGINE, _LAST_NQL_STATUS
-    if _LAST_NQL_STATUS is None:
-        _LAST_NQL_STATUS = {"attempted": False}
-    _LAST_ENGINE = "rule_based"
+    if _last_nql_status() is None:
+        _LAST.nql_status = {"attempted": False}
+    _LAST.engine = "rule_based"
     return _post_process_plan(question, plan.to_dict(), bundle)
 
 
 def build_plan_llm(question: str) -> Dict[str, object]:
-    global _LAST_ENGINE, _LAST_NQL_STATUS
-
-
     prompt = fill_time_tokens(PROMPT_PATH.read_text(encoding="utf-8"))
     semantic_yaml = SEMANTIC_PATH.read_text()
     columns = list_columns_for_prompt()
@@ -483,7 +487,7 @@ def build_plan_llm(question: str) -> Dict[str, object]:
         try:
             compiled = compile_payload(payload)
         except NQLValidationError as exc:
-            _LAST_NQL_STATUS = {
+            _LAST.nql_status = {
                 "attempted": True,
                 "valid": False,
                 "stage": "validator",
@@ -493,7 +497,7 @@ def build_plan_llm(question: str) -> Dict[str, object]:
             }
             raise RuntimeError(f"NQL validation failed: {exc}") from exc
         except Exception as exc:  # pragma: no cover - defensive path
-            _LAST_NQL_STATUS = {
+            _LAST.nql_status = {
                 "attempted": True,
                 "valid": False,
                 "stage": "compiler",
@@ -503,12 +507,12 @@ def build_plan_llm(question: str) -> Dict[str, object]:
             }
             raise RuntimeError(f"NQL compilation failed: {exc}") from exc
         else:
-            _LAST_NQL_STATUS = {"attempted": True, "valid": True}
+            _LAST.nql_status = {"attempted": True, "valid": True}
         plan = compiled.plan
     else:
         if not isinstance(payload, dict):
             raise RuntimeError("LLM returned non-dict plan payload")
-        _LAST_NQL_STATUS = {"attempted": False}
+        _LAST.nql_status = {"attempted": False}
         plan = payload
         try:
             assert isinstance(plan.get("metrics", []), list)
@@ -518,24 +522,23 @@ def build_plan_llm(question: str) -> Dict[str, object]:
             raise RuntimeError("LLM returned invalid planner payload") from exc
         plan = _post_process_plan(question, plan, bundle)
 
-    _LAST_ENGINE = "llm"
+    _LAST.engine = "llm"
     return plan
 
 
 def build_plan(question: str, prefer_llm: bool = True) -> Dict[str, object]:
     """Primary planner entry point with LLM fallback."""
 
-    global _LAST_NQL_STATUS
-    _LAST_NQL_STATUS = None
+    _LAST.nql_status = None
     if not prefer_llm:
-        _LAST_NQL_STATUS = {"attempted": False}
+        _LAST.nql_status = {"attempted": False}
         return build_plan_rule_based(question)
 
     try:
         return build_plan_llm(question)
     except (LLMNotConfigured, RuntimeError):
-        if _LAST_NQL_STATUS is None:
-            _LAST_NQL_STATUS = {"attempted": False}
+        if _last_nql_status() is None:
+            _LAST.nql_status = {"attempted": False}
         return build_plan_rule_based(question)
 def _next_month_start(value: date) -> date:
     month = value.month + 1
@@ -43,8 +43,8 @@ class Canonicalizer:
         if like_bypass:
             return CanonicalResolution(value=raw, applied=False, like_bypass=True)
         lookup = self._get_dim_map(dim)
-        normalised = _normalise(token)
-        entry = lookup.get(normalised)
+        # ``token`` is already stripped; only case folding remains.
+        entry = lookup.get(token.lower())
         if not entry:
             return CanonicalResolution(value=raw, applied=False, like_bypass=False)
         canonical = entry.get("canonical") or raw
@@ -58,9 +58,7 @@ class Canonicalizer:
 
     # ------------------------------------------------------------------
     def _get_dim_map(self, dim: str) -> Dict[str, Dict[str, float]]:
+        # ``load`` swaps in freshly copied maps and never mutates them later,
+        # so readers can share the current one without copying it.
         with self._lock:
-            return dict(self._mappings.get(dim, {}))
-
-
-def _normalise(value: str) -> str:
-    return value.strip().lower()
+            return self._mappings.get(dim, {})
@@ -10,7 +10,9 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from app.conversation import (
+    ConversationStore,
     PendingClarification,
+    analyze_followup,
     apply_clarification_answer,
     assess_ambiguity,
     rewrite_followup,
@@ -62,3 +64,38 @@ def test_conversation_fixture(fixture_path: Path):
         normalised_actual = _normalise(actual)
         assert normalised_actual == expected
         state = normalised_actual
+
+
+@pytest.mark.parametrize("fixture_path", sorted(FIXTURES_DIR.glob("*.json")))
+def test_analyze_followup_matches_separate_calls(fixture_path: Path):
+    payload = json.loads(fixture_path.read_text())
+    today_value = date.fromisoformat(payload["today"])
+    state = _normalise(payload["initial_nql"])
+
+    for turn in payload["turns"]:
+        utterance = turn["utterance"]
+        result, merged = analyze_followup(state, utterance, today=today_value)
+        assert result == assess_ambiguity(state, utterance)
+        if result.needs_clarification:
+            assert merged is None
+            break
+        assert merged == rewrite_followup(state, utterance, today=today_value)
+        state = _normalise(merged)
+
+
+def test_store_keeps_compiled_model():
+    payload = json.loads((FIXTURES_DIR / "filters_add_remove.json").read_text())
+    model = NQLQuery.parse_obj(payload["initial_nql"])
+    store = ConversationStore()
+
+    store.update_last("session", model, {"sql": "select 1"})
+    assert store.peek("session").last_nql == model.dict()
+
+    plan = {"sql": "select 2"}
+    payload_nql = _normalise(payload["initial_nql"])
+    store.update_last("session", payload_nql, plan)
+    assert store.peek("session").last_plan == plan
+    assert store.peek("session").last_plan is not plan
+    store.update_last("session", payload_nql, plan, copy=False)
+    assert store.peek("session").last_nql is payload_nql
+    assert store.peek("session").last_plan is plan
@@ -82,3 +82,9 @@ from app.followup_rewriter import rewrite_followup_state
 def test_followup_rewriter(last_state, utterance, expected):
     assert rewrite_followup_state(last_state, utterance) == expected
 
+
+def test_followup_rewriter_repeated_lead_in_stays_linear():
+    # Each "how many" without a terminator used to rescan the whole run.
+    utterance = "how many " * 4000 + ", how many robberies in Hollywood?"
+    result = rewrite_followup_state({"metric": "incidents"}, utterance)
+    assert result["metric"] == "robberies"
@@ -26,10 +26,22 @@ if "duckdb" not in sys.modules:
             self._fetched = True
             return [(i, f"val_{i}") for i in range(self.num_rows)]
 
+        def fetchmany(self, size):
+            return self.fetchall()[:size]
+
     class MockConnection:
         def __init__(self, num_rows=100):
             self.num_rows = num_rows
 
+        def cursor(self):
+            return self
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            return False
+
         def execute(self, sql):
             return MockResult(self.num_rows)
 
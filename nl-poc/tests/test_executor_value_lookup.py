@@ -0,0 +1,100 @@
+"""Value lookups behind ``DuckDBExecutor.find_closest_value`` and ``closest_matches``."""
+import random
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+import duckdb
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import app.executor as executor_module  # noqa: E402
+from app.executor import (  # noqa: E402
+    DuckDBExecutor,
+    _edit_distance,
+    _levenshtein,
+    _myers_distance,
+)
+
+AREA = SimpleNamespace(name="area", column="AREA NAME")
+
+# Captured at import: test_executor_rowcap swaps ``duckdb.connect`` for a mock.
+_CONNECT = duckdb.connect
+
+
+class _CountingConnection:
+    def __init__(self, values):
+        self.values = values
+        self.distinct_queries = 0
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, sql):
+        if sql.startswith("SELECT DISTINCT"):
+            self.distinct_queries += 1
+        return SimpleNamespace(fetchall=lambda: [(v,) for v in self.values])
+
+
+def test_distinct_values_cached_until_invalidated(monkeypatch):
+    conn = _CountingConnection(["Hollywood", "Central", None, "CENTRAL"])
+    monkeypatch.setattr(executor_module.duckdb, "connect", lambda path: conn)
+    executor = DuckDBExecutor(Path(":memory:"))
+
+    assert executor.find_closest_value(AREA, "hollywood") == "Hollywood"
+    assert executor.find_closest_value(AREA, "central") == "Central"
+    assert executor.find_closest_value(AREA, "holly") == "Hollywood"
+    assert executor.closest_matches(AREA, "centrl", limit=1) == ["Central"]
+    assert conn.distinct_queries == 1
+
+    conn.values.append("Harbor")
+    assert executor.find_closest_value(AREA, "harb") is None
+    executor.invalidate_distinct_cache()
+    assert executor.find_closest_value(AREA, "harb") == "Harbor"
+    assert conn.distinct_queries == 2
+
+
+@pytest.mark.skipif(not hasattr(duckdb, "__file__"), reason="duckdb is stubbed out")
+def test_concurrent_queries_share_one_executor(monkeypatch, tmp_path):
+    monkeypatch.setattr(executor_module.duckdb, "connect", _CONNECT)
+    executor = DuckDBExecutor(tmp_path / "crime.duckdb")
+    executor.connection.execute(
+        """
+        CREATE TABLE la_crime_raw AS
+        SELECT 'Area ' || (i % 21) AS "AREA NAME", i AS n FROM range(200000) t(i)
+        """
+    )
+    sql = 'SELECT "AREA NAME", COUNT(*) AS n FROM la_crime_raw GROUP BY 1 ORDER BY 1'
+
+    def run(_):
+        result = executor.query(sql)
+        return result.rowcount, executor.find_closest_value(AREA, "area 20")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        outcomes = list(pool.map(run, range(32)))
+
+    assert outcomes == [(21, "Area 20")] * 32
+    executor.close()
+
+
+def test_myers_matches_dynamic_programming():
+    rng = random.Random(7)
+    for _ in range(2000):
+        a = "".join(rng.choice("abc d") for _ in range(rng.randint(0, 20)))
+        b = "".join(rng.choice("abc d") for _ in range(rng.randint(0, 64)))
+        assert _myers_distance(a, b) == _levenshtein(a, b)
+
+
+def test_score_cutoff_reports_cutoff_plus_one():
+    assert _levenshtein("hollywood", "holywood", 0) == 1
+    assert _edit_distance("hollywood", "holywood", 1) == 1
+    assert _edit_distance("hollywood", "central", 2) == 3
+    assert _edit_distance("x" * 80, "y" * 70, 5) == 6
@@ -3,11 +3,13 @@ from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
+import json
 import os
+import threading
 from datetime import date
 from importlib import reload
 
-from app.planner import build_plan
+from app.planner import build_plan, get_last_intent_engine
 
 
 def test_plan_top10_crimes_ytd():
@@ -54,3 +56,31 @@ def test_trend_question_without_dates_gets_trailing_year(monkeypatch):
     filter_value = month_filters[0]
     assert filter_value["op"] == "between"
     assert filter_value["value"] == ["2023-06-01", "2024-06-01"]
+
+
+def test_last_intent_engine_is_per_thread(monkeypatch):
+    monkeypatch.setattr(
+        "app.planner.call_intent_llm",
+        lambda *args: json.dumps({"metrics": ["incidents"], "group_by": ["area"], "filters": []}),
+    )
+    llm_done = threading.Event()
+    engines = {}
+
+    def rule_based_caller():
+        build_plan("Incidents by area for 2023-06.", prefer_llm=False)
+        # Read back only after the other thread has planned through the LLM.
+        llm_done.wait(timeout=5)
+        engines["rule_based"] = get_last_intent_engine()
+
+    def llm_caller():
+        build_plan("Incidents by area", prefer_llm=True)
+        engines["llm"] = get_last_intent_engine()
+        llm_done.set()
+
+    threads = [threading.Thread(target=rule_based_caller), threading.Thread(target=llm_caller)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert engines == {"rule_based": "rule_based", "llm": "llm"}
@@ -0,0 +1,18 @@
+from app.canonical.fuzzy import FuzzyMatcher
+
+
+CANDIDATES = ["Mortal Kombat 1", "(Mortal) Kombat II", "Street Fighter", "Central", "Hollywood"]
+
+
+def test_index_keeps_acronym_and_prefix_hits():
+    matcher = FuzzyMatcher()
+    names = [match.candidate for match in matcher.rank("mk", CANDIDATES)]
+    assert names == ["(Mortal) Kombat II", "Mortal Kombat 1"]
+    assert [match.candidate for match in matcher.rank("cent", CANDIDATES)] == ["Central"]
+
+
+def test_index_refits_when_candidates_change():
+    matcher = FuzzyMatcher()
+    matcher.fit(CANDIDATES)
+    assert matcher.rank("holly", ["North Hollywood"])[0].candidate == "North Hollywood"
+    assert matcher.rank("zzz", CANDIDATES) == []
@@ -1,7 +1,10 @@
 import time
 
+import duckdb
+
 from app.canonical.store import CanonicalStore
 from app.canonical.watcher import CanonicalWatcher
+from app.executor import DuckDBExecutor
 from app.resolver import PlanResolver
 from app.resolver.canonicalizer import Canonicalizer
 
@@ -54,3 +57,53 @@ def test_hot_reload_watcher(make_store, crime_semantic, executor):
         assert refreshed["canonicalization"]["applied"] is True
     finally:
         watcher.stop()
+
+
+def test_migrates_legacy_synonym_variants(db_path, games_semantic):
+    # A pre-synonym_key table whose (dim, synonym) index allowed case and
+    # whitespace variants of the same key.
+    con = duckdb.connect(str(db_path))
+    con.execute("CREATE SEQUENCE canonical_map_id_seq START 1")
+    con.execute(
+        """
+        CREATE TABLE canonical_map (
+            id BIGINT DEFAULT nextval('canonical_map_id_seq'),
+            dim TEXT NOT NULL,
+            synonym TEXT NOT NULL,
+            canonical TEXT NOT NULL,
+            score DOUBLE DEFAULT 1.0,
+            promoted_by TEXT,
+            promoted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (id)
+        )
+        """
+    )
+    con.execute("CREATE UNIQUE INDEX canonical_map_dim_syn ON canonical_map(dim, synonym)")
+    con.execute(
+        "INSERT INTO canonical_map(dim, synonym, canonical, promoted_at) VALUES "
+        "('title', ' mk1', 'Mortal Kombat II', '2024-01-02'), "
+        "('title', 'MK1', 'Mortal Kombat 1', '2024-03-01'), "
+        "('title', 'mk1 ', 'Mario Kart', '2023-01-01')"
+    )
+    con.close()
+
+    store = CanonicalStore(DuckDBExecutor(db_path), games_semantic)
+    mappings = store.load_mappings()
+    assert list(mappings["title"]) == ["mk1"]
+    assert store.current_mapping("title", "mk1") == "Mortal Kombat 1"
+
+    version = store.promote("title", " Mk1", "Mortal Kombat II", 1.0)
+    assert store.current_mapping("title", "MK1") == "Mortal Kombat II"
+    assert store.get_version() == version
+
+
+def test_mapping_cache_follows_other_store_promotions(make_store, games_semantic):
+    reader: CanonicalStore = make_store(games_semantic)
+    writer: CanonicalStore = make_store(games_semantic)
+    assert reader.current_mapping("title", "mk1") is None
+
+    for canonical in ("Mortal Kombat 1", "Mortal Kombat II"):
+        version = writer.promote("title", "mk1", canonical, 1.0)
+        assert reader.current_mapping("title", "mk1") == canonical
+        # Only the latest version's mapping stays cached.
+        assert reader._mapping_cache["title"][0] == version